@@ -1,14 +1,27 @@
-from flask import Flask
+from flask import Flask, current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from flask_migrate import Migrate
 from .models import User, UserRole,db
+from .cache import response_cache
+from .passwords import password_hasher
+from .metrics import metrics
+from .compression import compression
+from .ratelimit import rate_limiter
+from .events import event_hub
+from .serialization import init_json
+from .config import Config
+from .database import (configure_database, register_engine_events, schema_fingerprint,
+                       stored_fingerprint, store_fingerprint)
+from .search import INDEX_DDL, ensure_search_index, include_in_migrations
+from .inventory import schedule_sweep
+from .jobs import schedule_purge
+from .archive import schedule_archive
+import click
 
 # Initialize Flask extensions
 
 jwt = JWTManager()
-migrate = Migrate()
 def create_admin():
     with db.session.begin():
         existing_admin = User.query.filter_by(role = UserRole.ADMIN).first()
@@ -16,7 +29,7 @@ def create_admin():
             admin = User(
                 email = "admin@email.com",
                 name = "AdminName",
-                password = "password",
+                password = password_hasher.hash("password"),
                 role = UserRole.ADMIN
             )
             db.session.add(admin)
@@ -25,34 +38,99 @@ def create_admin():
         else:
             print("Admin already exists")
 
-def create_app():
+def init_database(force=False):
+    """Create missing tables and the search index, seed the admin and queue the periodic jobs.
+
+    Run once per deployment (``flask init-db``), not on every worker start.
+    With FAST_START, the table, index and admin checks are skipped while the
+    schema fingerprint stored by the last check still matches the models;
+    force runs them anyway. Returns whether the checks ran.
+    """
+    dialect = db.engine.dialect
+    fingerprint = schema_fingerprint(dialect, INDEX_DDL.get(dialect.name, ()))
+    check = force or not current_app.config['FAST_START'] or stored_fingerprint() != fingerprint
+    if check:
+        db.create_all(bind_key=None)  # the replica is read-only
+        ensure_search_index()
+        create_admin()
+        store_fingerprint(fingerprint)
+    schedule_sweep()
+    schedule_archive()
+    schedule_purge()
+    db.session.commit()
+    return check
+
+@click.command('init-db')
+@click.option('--force', is_flag=True, help='Check the schema even if its fingerprint is unchanged.')
+def init_db_command(force):
+    """Create the schema and seed the admin account."""
+    if init_database(force):
+        click.echo('Database initialized')
+    else:
+        click.echo('Schema unchanged, skipped checks (use --force to run them)')
+
+class MigrateGroup(click.Group):
+    """"flask db", importing Flask-Migrate (and alembic) only when a db command runs."""
+
+    def make_context(self, info_name, args, parent=None, **extra):
+        from flask.cli import ScriptInfo
+        from flask_migrate import Migrate
+        from flask_migrate.cli import db as db_cli
+        app = parent.ensure_object(ScriptInfo).load_app()
+        if 'migrate' not in app.extensions:
+            Migrate(app, db, render_as_batch=True, include_object=include_in_migrations)
+        return db_cli.make_context(info_name, args, parent=parent, **extra)
+
+def create_app(config=None):
     app = Flask(__name__)
 
-    # App Configuration
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///database.db'
-    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    app.config['SECRET_KEY'] = 'djski32jfdskjfsa0kf'  
-    app.config['JWT_SECRET_KEY'] = 'KDS73JD9WKU0EKSNFO0DMS'  
+    # App Configuration (environment-driven, see config.py)
+    app.config.from_object(Config)
+    if config:
+        app.config.from_mapping(config)
+    configure_database(app)
+    init_json(app)
 
     # Initialize Extensions
     db.init_app(app)
     jwt.init_app(app)
-    migrate.init_app(app, db)
-    CORS(app)  # Enable CORS for Vue.js frontend
+    response_cache.init_app(app)
+    password_hasher.init_app(app)
+    metrics.init_app(app)
+    compression.init_app(app)
+    rate_limiter.init_app(app)
+    event_hub.init_app(app)
+    CORS(app, expose_headers=['X-Next-Cursor', 'ETag'])  # Enable CORS for Vue.js frontend
 
     # Import and Register Blueprints
     from .views import main as main_blueprint
     from .auth import auth as auth_blueprint
     from .api import api as api_blueprint
     from .admin import admin as admin_blueprint
+    from .serving import health as health_blueprint
+    from .events import events as events_blueprint
 
+    app.register_blueprint(health_blueprint)
     app.register_blueprint(main_blueprint)
+    app.register_blueprint(events_blueprint)
     app.register_blueprint(auth_blueprint, url_prefix='/auth')
     app.register_blueprint(api_blueprint, url_prefix='/api')
     app.register_blueprint(admin_blueprint, url_prefix='/admin')
 
-    # Create database tables if not already created
+    # Background jobs: handlers register themselves on import
+    from . import invoices  # noqa: F401
+    from .jobs import jobs_cli
+    from .analytics import analytics_cli
+    from .inventory import inventory_cli
+    from .archive import orders_cli
+    app.cli.add_command(jobs_cli)
+    app.cli.add_command(analytics_cli)
+    app.cli.add_command(inventory_cli)
+    app.cli.add_command(orders_cli)
+    app.cli.add_command(init_db_command)
+    app.cli.add_command(MigrateGroup('db', help='Database migrations (Flask-Migrate).'))
+
+    # Schema creation lives in "flask init-db", so starting N workers costs no DDL
     with app.app_context():
-        db.create_all()
-        create_admin()
+        register_engine_events(app)
     return app
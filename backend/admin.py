@@ -1,34 +1,37 @@
-from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from .models import User, Product, Category
-from . import db
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from flask_jwt_extended import jwt_required
+from sqlalchemy import select
+from .models import Product, Category
+from .identity import admin_required
+from .catalog import product_list_response
+from .cache import response_cache
+from .events import event_hub, product_delta
+from .database import read_bind
+from .pagination import page_limit, list_response
+from .pricing import to_cents
+from . import db, analytics, bulk
+from datetime import date
 
 admin = Blueprint('admin', __name__)
 
-def is_admin(user_id):
-    """Check if the user is an admin."""
-    user = User.query.get(user_id)
-    return user and user.role == "admin"
-
 # -----------------------------------
 # CRUD Operations for Categories
 # -----------------------------------
 @admin.route('/categories', methods=['GET'])
 @jwt_required()
+@response_cache.cached('categories')
 def get_categories():
     """Get all categories."""
-    categories = Category.query.all()
-    category_list = [{"id": c.id, "name": c.name, "description": c.description} for c in categories]
-    return jsonify(category_list)
+    rows = db.session.execute(
+        select(Category.id, Category.name, Category.description), bind_arguments=read_bind(),
+    ).mappings()
+    # A list, not a stream: the cache stores the whole body anyway
+    return list_response([dict(row) for row in rows])
 
 @admin.route('/category', methods=['POST'])
-@jwt_required()
+@admin_required
 def add_category():
     """Add a new category (Admin Only)."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-
     data = request.get_json()
     name = data.get('name')
     description = data.get('description')
@@ -39,17 +42,14 @@ def add_category():
     category = Category(name=name, description=description)
     db.session.add(category)
     db.session.commit()
+    response_cache.invalidate('categories')
 
     return jsonify({'message': 'Category added successfully', 'category_id': category.id})
 
 @admin.route('/category/<int:category_id>', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_category(category_id):
     """Update an existing category (Admin Only)."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-
     category = Category.query.get(category_id)
     if not category:
         return jsonify({'error': 'Category not found'}), 404
@@ -59,42 +59,35 @@ def update_category(category_id):
     category.description = data.get('description', category.description)
 
     db.session.commit()
+    response_cache.invalidate('categories')
     return jsonify({'message': 'Category updated successfully'})
 
 @admin.route('/category/<int:category_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_category(category_id):
     """Delete a category (Admin Only)."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-
     category = Category.query.get(category_id)
     if not category:
         return jsonify({'error': 'Category not found'}), 404
 
     db.session.delete(category)
     db.session.commit()
+    response_cache.invalidate('categories')
     return jsonify({'message': 'Category deleted successfully'})
 
 # -----------------------------------
 # CRUD Operations for Products
 # -----------------------------------
 @admin.route('/products', methods=['GET'])
+@response_cache.cached('products')
 def get_products():
-    """Get all products."""
-    products = Product.query.all()
-    product_list = [{"id": p.id, "name": p.name, "price": p.price, "stock": p.stock, "category_id": p.category_id} for p in products]
-    return jsonify(product_list)
+    """Get a page of products."""
+    return product_list_response(request.args, ("id", "name", "price", "stock", "category_id"))
 
 @admin.route('/product', methods=['POST'])
-@jwt_required()
+@admin_required
 def add_product():
     """Add a new product (Admin Only)."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-
     data = request.get_json()
     name = data.get('name')
     price = data.get('price')
@@ -104,45 +97,122 @@ def add_product():
     if not name or not price or not category_id:
         return jsonify({'error': 'Name, price, and category_id are required'}), 400
 
-    product = Product(name=name, price=price, stock=stock, category_id=category_id)
+    try:
+        price_cents = to_cents(price)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    product = Product(name=name, price_cents=price_cents, stock=stock, category_id=category_id)
     db.session.add(product)
     db.session.commit()
+    response_cache.invalidate('products')
+    event_hub.publish('products', 'product', product_delta(product))
 
     return jsonify({'message': 'Product added successfully', 'product_id': product.id})
 
 @admin.route('/product/<int:product_id>', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_product(product_id):
     """Update an existing product (Admin Only)."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-
     product = Product.query.get(product_id)
     if not product:
         return jsonify({'error': 'Product not found'}), 404
 
     data = request.get_json()
+    if 'price' in data:
+        try:
+            product.price_cents = to_cents(data['price'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     product.name = data.get('name', product.name)
-    product.price = data.get('price', product.price)
     product.stock = data.get('stock', product.stock)
     product.category_id = data.get('category_id', product.category_id)
 
+    delta = product_delta(product)
     db.session.commit()
+    response_cache.invalidate('products')
+    event_hub.publish('products', 'product', delta)
     return jsonify({'message': 'Product updated successfully'})
 
 @admin.route('/product/<int:product_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_product(product_id):
     """Delete a product (Admin Only)."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-
     product = Product.query.get(product_id)
     if not product:
         return jsonify({'error': 'Product not found'}), 404
 
     db.session.delete(product)
     db.session.commit()
+    response_cache.invalidate('products')
+    event_hub.publish('products', 'product.deleted', {'id': product_id})
     return jsonify({'message': 'Product deleted successfully'})
+
+# -----------------------------------
+# Bulk Import / Export
+# -----------------------------------
+def bulk_format():
+    """Pick csv or ndjson from ?format= or the request content type."""
+    fmt = request.args.get('format')
+    if not fmt:
+        fmt = 'ndjson' if 'ndjson' in (request.mimetype or '') else 'csv'
+    return fmt if fmt in bulk.IMPORT_FORMATS else None
+
+@admin.route('/products/import', methods=['POST'])
+@admin_required
+def import_products():
+    """Bulk create/update products from a streamed CSV or NDJSON body (Admin Only)."""
+    fmt = bulk_format()
+    if not fmt:
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+
+    report = bulk.import_products(request.stream, fmt)
+    if report['written']:
+        response_cache.invalidate('products')
+        # Too many rows for per-product deltas; clients refetch the catalog
+        event_hub.publish('products', 'catalog', {'written': report['written']})
+    return jsonify(report)
+
+@admin.route('/products/export', methods=['GET'])
+@admin_required
+def export_products():
+    """Stream the whole catalog as CSV or NDJSON (Admin Only)."""
+    fmt = bulk_format()
+    if not fmt:
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+
+    if fmt == 'csv':
+        body, mimetype = bulk.export_csv(), 'text/csv'
+    else:
+        body, mimetype = bulk.export_ndjson(), 'application/x-ndjson'
+    return Response(stream_with_context(body), mimetype=mimetype,
+                    headers={'Content-Disposition': f'attachment; filename=products.{fmt}'})
+
+# -----------------------------------
+# Reports (served from rollup tables)
+# -----------------------------------
+@admin.route('/reports/revenue', methods=['GET'])
+@admin_required
+def revenue_report():
+    """Revenue per day, optionally split by category with ?by=category (Admin Only)."""
+    try:
+        date_from = date.fromisoformat(request.args['from']) if request.args.get('from') else None
+        date_to = date.fromisoformat(request.args['to']) if request.args.get('to') else None
+    except ValueError:
+        return jsonify({'error': 'Dates must be in YYYY-MM-DD format'}), 400
+
+    rows = analytics.revenue_report(date_from, date_to, by_category=request.args.get('by') == 'category')
+    return list_response(rows)
+
+@admin.route('/reports/top-products', methods=['GET'])
+@admin_required
+def top_products_report():
+    """Best-selling products by units (Admin Only)."""
+    return jsonify(analytics.top_products(page_limit(request.args, default=10)))
+
+@admin.route('/reports/low-stock', methods=['GET'])
+@admin_required
+def low_stock_report():
+    """Products at or below ?threshold= units in stock (Admin Only)."""
+    threshold = request.args.get('threshold', 5, type=int)
+    return jsonify(analytics.low_stock(threshold, page_limit(request.args)))
@@ -0,0 +1,175 @@
+from flask.cli import AppGroup
+from sqlalchemy import delete, func, select
+from .models import Order, OrderItem, Product, Category, DailySales, ProductSales, db
+from .database import read_bind, upsert
+from .jobs import handler
+from .archive import archive_table
+from .pricing import from_cents
+from collections import namedtuple
+from itertools import chain
+import click
+
+SalesLine = namedtuple('SalesLine', 'order_id created_at product_id category_id units revenue')
+
+# -----------------------------------
+# ROLLUP MAINTENANCE
+# -----------------------------------
+def order_lines(order_ids=None):
+    """Per-order, per-product sales lines with the product's category."""
+    query = (
+        select(
+            Order.id.label('order_id'),
+            Order.created_at,
+            OrderItem.product_id,
+            Product.category_id,
+            func.sum(OrderItem.quantity).label('units'),
+            func.sum(OrderItem.quantity * OrderItem.price_cents).label('revenue'),
+        )
+        .join(OrderItem, OrderItem.order_id == Order.id)
+        .join(Product, Product.id == OrderItem.product_id)
+        .group_by(Order.id, Order.created_at, OrderItem.product_id, Product.category_id)
+    )
+    if order_ids is not None:
+        query = query.where(Order.id.in_(order_ids))
+    return db.session.execute(query).all()
+
+
+def archived_lines():
+    """Sales lines of archived orders, rebuilt from their line snapshots."""
+    table = archive_table()
+    categories = dict(db.session.execute(select(Product.id, Product.category_id)).all())
+    rows = db.session.execute(
+        select(table.c.id, table.c.created_at, table.c.lines).execution_options(yield_per=1000)
+    )
+    for order_id, created_at, lines in rows:
+        for line in lines or ():
+            # Lines of deleted products are skipped, as the join in order_lines() does
+            if line['product_id'] in categories:
+                yield SalesLine(order_id, created_at, line['product_id'], categories[line['product_id']],
+                                line['quantity'], line['quantity'] * line['price_cents'])
+
+
+def apply_lines(lines):
+    """Fold sales lines into the rollup tables with additive upserts, in cents."""
+    daily, products = {}, {}
+    for line in lines:
+        key = (line.created_at.date(), line.category_id)
+        units, revenue = daily.get(key, (0, 0))
+        daily[key] = (units + line.units, revenue + line.revenue)
+
+        units, revenue, last_sold = products.get(line.product_id, (0, 0, None))
+        last_sold = max(last_sold, line.created_at) if last_sold else line.created_at
+        products[line.product_id] = (units + line.units, revenue + line.revenue, last_sold)
+
+    if daily:
+        stmt = upsert(DailySales).values([
+            {'day': day, 'category_id': cid, 'units': u, 'revenue_cents': r}
+            for (day, cid), (u, r) in daily.items()
+        ])
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[DailySales.day, DailySales.category_id],
+            set_={
+                'units': DailySales.units + stmt.excluded.units,
+                'revenue_cents': DailySales.revenue_cents + stmt.excluded.revenue_cents,
+            },
+        ))
+
+    if products:
+        # Two-argument max() is SQLite's spelling of greatest()
+        greatest = func.max if db.session.get_bind().dialect.name == 'sqlite' else func.greatest
+        stmt = upsert(ProductSales).values([
+            {'product_id': pid, 'units': u, 'revenue_cents': r, 'last_sold_at': last}
+            for pid, (u, r, last) in products.items()
+        ])
+        db.session.execute(stmt.on_conflict_do_update(
+            index_elements=[ProductSales.product_id],
+            set_={
+                'units': ProductSales.units + stmt.excluded.units,
+                'revenue_cents': ProductSales.revenue_cents + stmt.excluded.revenue_cents,
+                'last_sold_at': greatest(ProductSales.last_sold_at, stmt.excluded.last_sold_at),
+            },
+        ))
+
+
+@handler('analytics.order')
+def record_order(payload):
+    """Add one placed order to the rollups (committed with the job itself)."""
+    apply_lines(order_lines([payload['order_id']]))
+
+
+def rebuild_rollups():
+    """Recompute every rollup from the order tables in one transaction.
+
+    This is the periodic compaction path: it repairs any drift and backfills
+    orders placed before the rollups existed. Archived orders count too.
+    """
+    db.session.execute(delete(DailySales))
+    db.session.execute(delete(ProductSales))
+    apply_lines(chain(order_lines(), archived_lines()))
+    db.session.commit()
+
+
+analytics_cli = AppGroup('analytics', help='Sales and inventory rollups.')
+
+
+@analytics_cli.command('rebuild')
+def rebuild_command():
+    """Recompute the sales rollups from scratch."""
+    rebuild_rollups()
+    click.echo('Sales rollups rebuilt')
+
+
+# -----------------------------------
+# REPORTS
+# -----------------------------------
+def revenue_report(date_from=None, date_to=None, by_category=False):
+    """Revenue and units sold per day (and optionally per category), as a generator.
+
+    The date range is open-ended, so rows are fetched in batches instead
+    of being loaded all at once.
+    """
+    columns = [DailySales.day]
+    if by_category:
+        columns += [DailySales.category_id, Category.name.label('category')]
+    query = select(
+        *columns,
+        func.sum(DailySales.revenue_cents).label('revenue'),
+        func.sum(DailySales.units).label('units'),
+    )
+    if by_category:
+        query = query.outerjoin(Category, Category.id == DailySales.category_id)
+    if date_from:
+        query = query.where(DailySales.day >= date_from)
+    if date_to:
+        query = query.where(DailySales.day <= date_to)
+    query = query.group_by(*columns).order_by(DailySales.day)
+
+    rows = db.session.execute(query.execution_options(yield_per=500), bind_arguments=read_bind()).mappings()
+    for row in rows:
+        yield {**row, 'day': row['day'].isoformat(), 'revenue': from_cents(int(row['revenue']))}
+
+
+def top_products(limit=10):
+    """Best sellers by units sold."""
+    rows = db.session.execute(
+        select(ProductSales.product_id, Product.name, ProductSales.units,
+               ProductSales.revenue_cents.label('revenue'), ProductSales.last_sold_at)
+        .join(Product, Product.id == ProductSales.product_id)
+        .order_by(ProductSales.units.desc())
+        .limit(limit),
+        bind_arguments=read_bind(),
+    ).mappings().all()
+    return [{**row, 'revenue': from_cents(row['revenue']),
+             'last_sold_at': row['last_sold_at'].isoformat() if row['last_sold_at'] else None} for row in rows]
+
+
+def low_stock(threshold=5, limit=50):
+    """Products at or below the stock threshold, emptiest first."""
+    rows = db.session.execute(
+        select(Product.id, Product.name, Product.stock, Product.category_id)
+        .where(Product.stock <= threshold)
+        .order_by(Product.stock, Product.id)
+        .limit(limit),
+        bind_arguments=read_bind(),
+    ).mappings().all()
+    return [dict(row) for row in rows]
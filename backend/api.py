@@ -1,16 +1,34 @@
 from flask import Blueprint, jsonify, request
 from flask_jwt_extended import jwt_required
 from .models import Product
-from . import db
+from .catalog import product_list_response
+from .cache import response_cache
+from .events import event_hub, product_delta
+from .pagination import page_limit
+from .pricing import to_cents
+from . import db, search
 
 api = Blueprint('api', __name__)
 
 @api.route('/products', methods=['GET'])
+@response_cache.cached('products')
 def get_products():
-    """Fetch all products."""
-    products = Product.query.all()
-    product_list = [{"id": p.id, "name": p.name, "price": p.price, "description": p.description} for p in products]
-    return jsonify(product_list)
+    """Fetch a page of products (filters: category_id, min_price, max_price, in_stock)."""
+    return product_list_response(request.args, ("id", "name", "price", "description"))
+
+@api.route('/products/search', methods=['GET'])
+def search_products():
+    """Full-text product search with prefix matching, ranking and category facets."""
+    q = request.args.get('q', '')
+    result = search.search_products(
+        q,
+        category_id=request.args.get('category_id', type=int),
+        limit=page_limit(request.args, default=20),
+        offset=max(request.args.get('offset', 0, type=int), 0),
+    )
+    if result is None:
+        return jsonify({'error': 'Search query q is required'}), 400
+    return jsonify(result)
 
 @api.route('/product', methods=['POST'])
 @jwt_required()
@@ -21,10 +39,17 @@ def add_product():
     price = data.get('price')
     description = data.get('description')
 
-    new_product = Product(name=name, price=price, description=description)
+    try:
+        price_cents = to_cents(price)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    new_product = Product(name=name, price_cents=price_cents, description=description)
 
     db.session.add(new_product)
     db.session.commit()
+    response_cache.invalidate('products')
+    event_hub.publish('products', 'product', product_delta(new_product))
 
     return jsonify({'message': 'Product added successfully', 'product_id': new_product.id})
 
@@ -37,10 +62,17 @@ def update_product(product_id):
         return jsonify({'error': 'Product not found'}), 404
 
     data = request.get_json()
+    if 'price' in data:
+        try:
+            product.price_cents = to_cents(data['price'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     product.name = data.get('name', product.name)
-    product.price = data.get('price', product.price)
     product.description = data.get('description', product.description)
 
+    delta = product_delta(product)
     db.session.commit()
+    response_cache.invalidate('products')
+    event_hub.publish('products', 'product', delta)
     return jsonify({'message': 'Product updated successfully'})
 
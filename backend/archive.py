@@ -0,0 +1,181 @@
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import MetaData, delete, select
+from .models import ArchivedOrder, Invoice, Job, Order, OrderItem, db
+from .database import upsert
+from .jobs import handler, enqueue
+from .pagination import split_page
+from .pricing import from_cents
+from datetime import datetime, timedelta
+import click
+
+ARCHIVE_SCHEMA = 'archive'
+
+# Columns shared by the hot and archived order tables
+SUMMARY_COLUMNS = ('id', 'user_id', 'subtotal_cents', 'discount_cents', 'tax_cents', 'total_cents',
+                   'status', 'created_at', 'item_count', 'lines')
+
+# archived_order as seen through an attached archive file
+attached_table = ArchivedOrder.__table__.to_metadata(MetaData(), schema=ARCHIVE_SCHEMA)
+
+
+def archive_table():
+    """The archived_order table to use for the current session.
+
+    With ORDER_ARCHIVE_PATH set, the file is attached to the session's
+    SQLite connection on first use (and the table created in it if
+    missing); pooled connections stay attached afterwards.
+    """
+    path = current_app.config['ORDER_ARCHIVE_PATH']
+    if not path:
+        return ArchivedOrder.__table__
+
+    connection = db.session.connection()
+    if connection.dialect.name != 'sqlite':
+        raise RuntimeError('ORDER_ARCHIVE_PATH requires SQLite; leave it unset to archive into archived_order')
+    if 'order_archive' not in connection.info:
+        connection.exec_driver_sql(f'ATTACH DATABASE ? AS {ARCHIVE_SCHEMA}', (path,))
+        attached_table.create(connection, checkfirst=True)
+        connection.info['order_archive'] = path
+    return attached_table
+
+
+# -----------------------------------
+# HISTORY
+# -----------------------------------
+def summary_select(table, user_id, date_from=None, date_to=None, cursor=None):
+    """Newest-first order summaries of one user from the hot or the archive table."""
+    query = select(*[table.c[name] for name in SUMMARY_COLUMNS]).where(table.c.user_id == user_id)
+    if date_from:
+        query = query.where(table.c.created_at >= date_from)
+    if date_to:
+        query = query.where(table.c.created_at <= date_to)
+    if cursor is not None:
+        query = query.where(table.c.id < cursor)
+    return query.order_by(table.c.id.desc())
+
+
+def order_summary(row):
+    return {
+        "order_id": row.id,
+        "subtotal": from_cents(row.subtotal_cents),
+        "discount": from_cents(row.discount_cents),
+        "tax": from_cents(row.tax_cents),
+        "total_amount": from_cents(row.total_cents),
+        "status": row.status,
+        "created_at": row.created_at.isoformat() if row.created_at else None,
+        "invoice_number": row.invoice_number,
+        "item_count": row.item_count,
+        "items": [
+            {"product_id": line['product_id'], "name": line['name'], "quantity": line['quantity'],
+             "price": from_cents(line['price_cents'])}
+            for line in row.lines or ()
+        ],
+    }
+
+
+def history_page(user_id, date_from=None, date_to=None, cursor=None, limit=20):
+    """One page of the user's orders, newest first, and the cursor for the next.
+
+    Hot orders are read first and the archive only when they do not fill
+    the page. Archived orders are older than every hot one, so a single id
+    cursor pages through both; continuing below the last hot id also skips
+    an order caught in both tables mid-archive.
+    """
+    order = Order.__table__
+    hot = (
+        summary_select(order, user_id, date_from, date_to, cursor)
+        .add_columns(Invoice.invoice_number)
+        .outerjoin(Invoice, Invoice.order_id == order.c.id)
+    )
+    rows = db.session.execute(hot.limit(limit + 1)).all()
+
+    if len(rows) <= limit:
+        table = archive_table()
+        archived = (
+            summary_select(table, user_id, date_from, date_to, rows[-1].id if rows else cursor)
+            .add_columns(table.c.invoice_number)
+        )
+        rows += db.session.execute(archived.limit(limit + 1 - len(rows))).all()
+
+    rows, has_more = split_page(rows, limit)
+    return [order_summary(row) for row in rows], rows[-1].id if has_more else None
+
+
+# -----------------------------------
+# ARCHIVER
+# -----------------------------------
+def archive_orders(before=None, batch_size=None):
+    """Move orders created before the cutoff into the archive, one committed batch at a time.
+
+    Each order becomes one archived_order row carrying its summary and
+    invoice number; its order_item and invoice rows are deleted with it.
+    Returns the number of orders moved.
+    """
+    config = current_app.config
+    if before is None:
+        before = datetime.utcnow() - timedelta(days=config['ORDER_ARCHIVE_AFTER_DAYS'])
+    batch_size = batch_size or config['ORDER_ARCHIVE_BATCH']
+    table = archive_table()
+    order = Order.__table__
+
+    moved = 0
+    while True:
+        rows = db.session.execute(
+            select(*[order.c[name] for name in SUMMARY_COLUMNS], Invoice.invoice_number)
+            .outerjoin(Invoice, Invoice.order_id == order.c.id)
+            .where(order.c.created_at < before)
+            .order_by(order.c.id)
+            .limit(batch_size)
+        ).mappings().all()
+        if not rows:
+            return moved
+
+        ids = [row['id'] for row in rows]
+        now = datetime.utcnow()
+        # A batch interrupted after the insert just finds its rows already archived
+        db.session.execute(
+            upsert(table).values([{**row, 'archived_at': now} for row in rows])
+            .on_conflict_do_nothing(index_elements=[table.c.id])
+        )
+        for model, column in ((Invoice, Invoice.order_id), (OrderItem, OrderItem.order_id), (Order, Order.id)):
+            db.session.execute(
+                delete(model).where(column.in_(ids)).execution_options(synchronize_session=False)
+            )
+        db.session.commit()
+
+        moved += len(rows)
+        if len(rows) < batch_size:
+            return moved
+
+
+def schedule_archive(delay=0):
+    """Queue the next archiver run unless archival is disabled or a run is already waiting."""
+    if current_app.config['ORDER_ARCHIVE_AFTER_DAYS'] <= 0:
+        return
+    pending = db.session.execute(
+        select(Job.id).where(Job.kind == 'orders.archive', Job.status == 'queued').limit(1)
+    ).first()
+    if pending is None:
+        enqueue('orders.archive', delay=delay)
+
+
+@handler('orders.archive')
+def archive(payload):
+    """Archive old orders, then schedule the next run."""
+    if current_app.config['ORDER_ARCHIVE_AFTER_DAYS'] > 0:
+        archive_orders()
+    schedule_archive(current_app.config['ORDER_ARCHIVE_INTERVAL'])
+
+
+orders_cli = AppGroup('orders', help='Order archival.')
+
+
+@orders_cli.command('archive')
+@click.option('--days', type=int, default=None,
+              help='Archive orders older than this many days (default ORDER_ARCHIVE_AFTER_DAYS).')
+def archive_command(days):
+    """Move old orders into the archive now."""
+    days = current_app.config['ORDER_ARCHIVE_AFTER_DAYS'] if days is None else days
+    moved = archive_orders(before=datetime.utcnow() - timedelta(days=days))
+    click.echo(f'Archived {moved} orders older than {days} days')
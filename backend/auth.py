@@ -1,12 +1,15 @@
 from flask import Blueprint, request, jsonify
-from werkzeug.security import generate_password_hash, check_password_hash
-from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
+from flask_jwt_extended import create_access_token, jwt_required, get_jwt
 from .models import User
+from .identity import current_user_id
+from .passwords import password_hasher, HasherBusy
+from .ratelimit import rate_limiter
 from . import db
 
 auth = Blueprint('auth', __name__)
 
 @auth.route('/register', methods=['POST'])
+@rate_limiter.limit('auth')
 def register():
     """Register a new user and return JWT token."""
     data = request.get_json()
@@ -21,16 +24,17 @@ def register():
     if existing_user:
         return jsonify({'error': 'User already exists'}), 400
 
-    hashed_password = generate_password_hash(password, method='sha256')
+    hashed_password = password_hasher.hash(password)
     new_user = User(email=email, password=hashed_password)
 
     db.session.add(new_user)
     db.session.commit()
 
-    access_token = create_access_token(identity=new_user.id)
+    access_token = create_access_token(identity=new_user)
     return jsonify({'message': 'User registered successfully', 'access_token': access_token}), 201
 
 @auth.route('/login', methods=['POST'])
+@rate_limiter.limit('auth')
 def login():
     """Login user and return JWT token."""
     data = request.get_json()
@@ -38,15 +42,24 @@ def login():
     password = data.get('password')
 
     user = User.query.filter_by(email=email).first()
-    if not user or not check_password_hash(user.password, password):
+    if not password_hasher.verify(user.password if user else None, password):
         return jsonify({'error': 'Invalid email or password'}), 401
 
-    access_token = create_access_token(identity=user.id)
+    # Upgrade plaintext, legacy or weaker hashes to the current policy
+    if password_hasher.needs_rehash(user.password):
+        user.password = password_hasher.hash(password)
+        db.session.commit()
+
+    access_token = create_access_token(identity=user)
     return jsonify({'message': 'Login successful', 'access_token': access_token})
 
 @auth.route('/protected', methods=['GET'])
 @jwt_required()
 def protected():
     """A protected route that requires authentication."""
-    current_user_id = get_jwt_identity()
-    return jsonify({'message': 'Access granted', 'user_id': current_user_id})
+    return jsonify({'message': 'Access granted', 'user_id': current_user_id(), 'role': get_jwt().get('role')})
+
+@auth.errorhandler(HasherBusy)
+def hasher_busy(error):
+    """Shed login/register load when the hashing pool is saturated."""
+    return jsonify({'error': 'Too many authentication requests, retry shortly'}), 503, {'Retry-After': '1'}
@@ -0,0 +1,267 @@
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from .models import Product, Category, db
+from .database import read_bind, upsert
+from .catalog import product_column, product_row
+from .pricing import to_cents
+import csv
+import io
+
+CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 1000
+
+EXPORT_FIELDS = ("id", "name", "price", "description", "stock", "category_id")
+IMPORT_FORMATS = ("csv", "ndjson")
+# Range of the Integer columns (stock, category_id, id)
+INTEGER_RANGE = (-2**31, 2**31 - 1)
+
+
+# -----------------------------------
+# IMPORT
+# -----------------------------------
+def decode_lines(stream):
+    """Yield (text, ok) for each line of a UTF-8 byte stream; an Excel BOM is dropped.
+
+    A line that is not valid UTF-8 comes back with replacement characters
+    and ok=False, so its row can be reported instead of ending the import.
+    """
+    encoding = 'utf-8-sig'
+    for line in stream:
+        try:
+            yield line.decode(encoding), True
+        except UnicodeDecodeError:
+            yield line.decode(encoding, errors='replace'), False
+        encoding = 'utf-8'
+
+
+def read_rows(stream, fmt):
+    """Yield raw row dicts from a byte stream without reading it all at once.
+
+    Rows that cannot be parsed are yielded as {"_error": message} so they
+    are reported with their row number.
+    """
+    if fmt == 'csv':
+        undecodable = []
+
+        def lines():
+            for text, ok in decode_lines(stream):
+                if not ok:
+                    undecodable.append(text)
+                yield text
+
+        for row in csv.DictReader(lines()):
+            if undecodable:
+                undecodable.clear()
+                yield {"_error": 'Row is not valid UTF-8'}
+            else:
+                yield row
+        return
+
+    loads = current_app.json.loads
+    for line, ok in decode_lines(stream):
+        line = line.strip()
+        if not line:
+            continue
+        if not ok:
+            yield {"_error": 'Row is not valid UTF-8'}
+            continue
+        try:
+            row = loads(line)
+        except ValueError:
+            row = None
+        # Non-object lines are passed through so they show up as row errors
+        yield row if isinstance(row, dict) else {"_error": 'Row is not a JSON object'}
+
+
+def optional(value):
+    """Treat empty CSV cells like missing values."""
+    return None if value is None or value == '' else value
+
+
+def text_field(raw, key):
+    """An optional string column; other JSON types are rejected."""
+    value = optional(raw.get(key))
+    if value is not None and not isinstance(value, str):
+        raise ValueError(f'{key} must be a string')
+    return value
+
+
+def parse_integer(value):
+    """A CSV cell or JSON number as an int, or None if it is not a whole number."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    return None
+
+
+def integer_field(raw, key):
+    """An optional integer column; 2.9, true or values outside the column range are rejected."""
+    value = optional(raw.get(key))
+    if value is None:
+        return None
+    number = parse_integer(value)
+    if number is None:
+        raise ValueError(f'{key} must be an integer')
+    low, high = INTEGER_RANGE
+    if not low <= number <= high:
+        raise ValueError(f'{key} is out of range')
+    return number
+
+
+def clean_row(raw, category_ids, category_names):
+    """Validate one import row and return the columns to write.
+
+    Every field is type-checked here, so a malformed row is reported on its
+    own instead of failing the database write for its whole chunk.
+    """
+    if "_error" in raw:
+        raise ValueError(raw["_error"])
+
+    name = text_field(raw, 'name')
+    if not name:
+        raise ValueError('name is required')
+    description = text_field(raw, 'description')
+
+    try:
+        price_cents = to_cents(raw.get('price'))
+    except (ValueError, ArithmeticError):
+        raise ValueError('price must be a non-negative number')
+
+    stock = integer_field(raw, 'stock') or 0
+    if stock < 0:
+        raise ValueError('stock must not be negative')
+
+    category_id = integer_field(raw, 'category_id')
+    if category_id is not None:
+        if category_id not in category_ids:
+            raise ValueError(f'Unknown category_id {category_id}')
+    else:
+        category = text_field(raw, 'category')
+        if category not in category_names:
+            raise ValueError('A valid category_id or category name is required')
+        category_id = category_names[category]
+
+    row = {"name": name, "price_cents": price_cents, "description": description, "stock": stock, "category_id": category_id}
+
+    product_id = integer_field(raw, 'id')
+    if product_id is not None:
+        row["id"] = product_id
+    return row
+
+
+def write_chunk(new_rows, updates):
+    """Insert new products and upsert rows that carry an id, then commit."""
+    if new_rows:
+        db.session.execute(upsert(Product).values(new_rows))
+    if updates:
+        stmt = upsert(Product).values(list(updates.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Product.id],
+            set_={col: getattr(stmt.excluded, col) for col in ("name", "price_cents", "description", "stock", "category_id")},
+        )
+        db.session.execute(stmt)
+    db.session.commit()
+
+
+def import_products(stream, fmt):
+    """Stream products into the catalog in chunks of CHUNK_SIZE rows.
+
+    Rows with an id update that product (or create it with that id), rows
+    without one are inserted. Invalid rows are skipped and reported by their
+    1-based row number.
+    """
+    categories = db.session.execute(select(Category.id, Category.name)).all()
+    category_ids = {cid for cid, _ in categories}
+    category_names = {name: cid for cid, name in categories}
+
+    report = {"processed": 0, "written": 0, "error_count": 0, "errors": []}
+
+    def fail(row_numbers, message):
+        report["error_count"] += len(row_numbers)
+        for number in row_numbers:
+            if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                report["errors"].append({"row": number, "error": message})
+
+    def flush(new_rows, updates, numbers):
+        try:
+            write_chunk(new_rows, updates)
+            report["written"] += len(numbers)
+        except SQLAlchemyError as e:
+            db.session.rollback()
+            fail(numbers, f'Database error: {e.__class__.__name__}')
+
+    new_rows, updates, numbers = [], {}, []
+    for number, raw in enumerate(read_rows(stream, fmt), start=1):
+        report["processed"] += 1
+        try:
+            row = clean_row(raw, category_ids, category_names)
+        except ValueError as e:
+            fail([number], str(e))
+            continue
+
+        if "id" in row:
+            # The last row for an id wins within a chunk
+            updates[row["id"]] = row
+        else:
+            new_rows.append(row)
+        numbers.append(number)
+
+        if len(new_rows) + len(updates) >= CHUNK_SIZE:
+            flush(new_rows, updates, numbers)
+            new_rows, updates, numbers = [], {}, []
+
+    if numbers:
+        flush(new_rows, updates, numbers)
+    return report
+
+
+# -----------------------------------
+# EXPORT
+# -----------------------------------
+def iter_products(batch_size=CHUNK_SIZE):
+    """Yield product dicts in id order, one keyset batch at a time."""
+    columns = [product_column(f) for f in EXPORT_FIELDS]
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(*columns).where(Product.id > last_id).order_by(Product.id).limit(batch_size),
+            bind_arguments=read_bind(),
+        ).all()
+        if not rows:
+            return
+        yield from (product_row(EXPORT_FIELDS, row) for row in rows)
+        last_id = rows[-1].id
+
+
+def export_csv():
+    """Generate the catalog as CSV text chunks."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for count, row in enumerate(iter_products(), start=1):
+        writer.writerow(row.values())
+        if count % CHUNK_SIZE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def export_ndjson():
+    """Generate the catalog as newline-delimited JSON."""
+    dumps = current_app.json.dumps
+    lines = []
+    for row in iter_products():
+        lines.append(dumps(row))
+        if len(lines) == CHUNK_SIZE:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
@@ -0,0 +1,188 @@
+from flask import request, current_app, make_response
+from collections import OrderedDict
+from datetime import datetime, timezone
+from functools import wraps
+import hashlib
+import json
+import threading
+import time
+
+# Headers stored alongside a cached body and replayed on a hit
+CACHED_HEADERS = ('X-Next-Cursor',)
+
+
+class MemoryBackend:
+    """In-process LRU cache with per-entry TTL.
+
+    Each worker process keeps its own entries and version stamps, so an
+    invalidation only reaches the worker that made it; the others serve
+    stale responses until max_ttl runs out. Use Redis to share them.
+    """
+
+    def __init__(self, max_entries=1024, max_ttl=None):
+        self.max_entries = max_entries
+        self.max_ttl = max_ttl
+        self._data = OrderedDict()
+        # Version stamps are few and must never be evicted by cached bodies
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def expiry(self, ttl):
+        if self.max_ttl:
+            ttl = min(ttl, self.max_ttl) if ttl else self.max_ttl
+        return time.monotonic() + ttl if ttl else None
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = self.expiry(ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def get_version(self, namespace):
+        with self._lock:
+            version, expires_at = self._versions.get(namespace, (None, None))
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._versions[namespace]
+                return None
+            return version
+
+    def set_version(self, namespace, version):
+        expires_at = self.expiry(None)
+        with self._lock:
+            self._versions[namespace] = (version, expires_at)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self._versions.clear()
+
+
+class RedisBackend:
+    """Backend for any client speaking the redis-py get/set API."""
+
+    def __init__(self, client, prefix='raasan:cache:'):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, json.dumps(value), ex=ttl)
+
+    def get_version(self, namespace):
+        return self.get(f'{namespace}:version')
+
+    def set_version(self, namespace, version):
+        self.set(f'{namespace}:version', version)
+
+
+class ResponseCache:
+    """Read-through cache for serialized GET responses.
+
+    Entries are grouped into namespaces ("products", "categories"). Each
+    namespace has a version stamp (a nanosecond timestamp); invalidating a
+    namespace writes a new stamp so every old key stops matching, and the
+    stamp doubles as the Last-Modified time of the cached responses.
+    """
+
+    def __init__(self, app=None):
+        self.backend = None
+        self.ttl = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('CACHE_BACKEND', 'memory')  # memory, redis or none
+        app.config.setdefault('CACHE_TTL', 300)
+        app.config.setdefault('CACHE_MAX_ENTRIES', 1024)
+        app.config.setdefault('CACHE_MEMORY_TTL', 10)
+        app.config.setdefault('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+        app.config.setdefault('CACHE_REDIS_CLIENT', None)
+
+        kind = app.config['CACHE_BACKEND']
+        if kind == 'memory':
+            self.backend = MemoryBackend(app.config['CACHE_MAX_ENTRIES'], app.config['CACHE_MEMORY_TTL'])
+        elif kind == 'redis':
+            client = app.config['CACHE_REDIS_CLIENT']
+            if client is None:
+                try:
+                    import redis
+                except ImportError:
+                    raise RuntimeError("CACHE_BACKEND='redis' requires the redis package")
+                client = redis.Redis.from_url(app.config['CACHE_REDIS_URL'])
+            self.backend = RedisBackend(client)
+        elif kind == 'none':
+            self.backend = None
+        else:
+            raise ValueError(f"Unknown CACHE_BACKEND: {kind}")
+        self.ttl = app.config['CACHE_TTL']
+
+    def version(self, namespace):
+        """Current version stamp of a namespace, creating one if missing."""
+        version = self.backend.get_version(namespace)
+        if version is None:
+            version = self.invalidate(namespace)
+        return version
+
+    def invalidate(self, *namespaces):
+        """Drop every cached response in the given namespaces."""
+        if self.backend is None:
+            return None
+        version = str(time.time_ns())
+        for namespace in namespaces:
+            self.backend.set_version(namespace, version)
+        return version
+
+    def cached(self, namespace):
+        """Decorator caching a view's 200 responses with ETag/Last-Modified.
+
+        Streamed responses pass through uncached rather than being buffered.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.backend is None:
+                    return view(*args, **kwargs)
+
+                version = self.version(namespace)
+                key = f'{namespace}:{version}:{request.full_path}'
+                entry = self.backend.get(key)
+
+                if entry is None:
+                    response = make_response(view(*args, **kwargs))
+                    if response.status_code != 200 or response.is_streamed:
+                        return response
+                    body = response.get_data(as_text=True)
+                    entry = {
+                        'body': body,
+                        'etag': hashlib.md5(body.encode()).hexdigest(),
+                        'headers': {h: response.headers[h] for h in CACHED_HEADERS if h in response.headers},
+                    }
+                    self.backend.set(key, entry, self.ttl)
+                else:
+                    response = current_app.response_class(entry['body'], mimetype='application/json', headers=entry['headers'])
+
+                response.set_etag(entry['etag'])
+                response.last_modified = datetime.fromtimestamp(int(version) / 1e9, tz=timezone.utc)
+                return response.make_conditional(request)
+            return wrapper
+        return decorator
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,241 @@
+from sqlalchemy import delete, func, select, update
+from .models import Cart, CartItem, Product, db
+from .database import upsert
+from . import inventory
+from .pricing import from_cents, price_totals, totals_json
+from datetime import datetime
+
+CART_OPS = ('add', 'set', 'remove')
+
+
+class CartError(Exception):
+    """Raised when a cart mutation is rejected."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def is_integer(value):
+    """True for JSON integers; booleans are rejected even though bool subclasses int."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def cart_id_for(user_id):
+    """Id of the user's cart, creating it in the same statement if needed."""
+    stmt = upsert(Cart).values(user_id=user_id, created_at=datetime.utcnow())
+    # The no-op update makes RETURNING yield the existing row on conflict
+    stmt = stmt.on_conflict_do_update(index_elements=[Cart.user_id], set_={'user_id': stmt.excluded.user_id})
+    return db.session.execute(stmt.returning(Cart.id)).scalar_one()
+
+
+def current_items(cart_id, product_ids):
+    """product_id -> (quantity, held quantity) for those products already in the cart.
+
+    The rows stay locked until commit, so the hold sweeper cannot release a
+    hold between this read and the write that replaces it.
+    """
+    rows = db.session.execute(
+        select(CartItem.product_id, CartItem.quantity, CartItem.held_until)
+        .where(CartItem.cart_id == cart_id, CartItem.product_id.in_(product_ids))
+        .with_for_update()
+    ).all()
+    return {pid: (qty, qty if held_until else 0) for pid, qty, held_until in rows}
+
+
+def set_items(cart_id, quantities, held_until):
+    """Write the absolute quantity of each product_id and hold it until held_until."""
+    if not quantities:
+        return
+    now = datetime.utcnow()
+    stmt = upsert(CartItem).values([
+        {'cart_id': cart_id, 'product_id': pid, 'quantity': qty, 'added_at': now, 'held_until': held_until}
+        for pid, qty in quantities.items()
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[CartItem.cart_id, CartItem.product_id],
+        set_={'quantity': stmt.excluded.quantity, 'held_until': stmt.excluded.held_until},
+    )
+    db.session.execute(stmt)
+
+
+def remove_items(cart_id, product_ids):
+    """Drop the given products from the cart."""
+    if product_ids:
+        db.session.execute(delete(CartItem).where(CartItem.cart_id == cart_id, CartItem.product_id.in_(product_ids)))
+
+
+def remove_item(user_id, item_id):
+    """Delete one line of the user's cart by id and release its hold.
+
+    Returns False when the user's cart has no such line.
+    """
+    own_cart = select(Cart.id).where(Cart.user_id == user_id).scalar_subquery()
+    row = db.session.execute(
+        delete(CartItem)
+        .where(CartItem.id == item_id, CartItem.cart_id == own_cart)
+        .returning(CartItem.product_id, CartItem.quantity, CartItem.held_until)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        db.session.rollback()
+        return False
+    if row.held_until is not None:
+        inventory.release({row.product_id: row.quantity})
+    db.session.commit()
+    return True
+
+
+def stock_error(needed):
+    """The CartError explaining why needed (product_id -> extra units) can't be held."""
+    available = inventory.availability(needed)
+    for pid, qty in needed.items():
+        if pid not in available:
+            return CartError(f'Product {pid} not found', 404)
+        if available[pid] < qty:
+            return CartError(f'Not enough stock available for product {pid}')
+    return CartError('Stock changed, please retry', 409)
+
+
+def update_items(user_id, adds=None, sets=None, removes=()):
+    """Apply relative adds, absolute sets and removals, moving stock holds to match.
+
+    Claiming the cart row first serialises concurrent changes to the same
+    cart, so the quantities read here stay accurate until commit. Every held
+    line (changed or not) gets a fresh expiry.
+    """
+    adds, sets = adds or {}, sets or {}
+    cart_id = cart_id_for(user_id)
+    current = current_items(cart_id, [*adds, *sets, *removes])
+
+    targets = {pid: 0 for pid in removes}
+    targets.update(sets)
+    for pid, qty in adds.items():
+        targets[pid] = current.get(pid, (0, 0))[0] + qty
+
+    to_hold, to_release = {}, {}
+    for pid, qty in targets.items():
+        held = current.get(pid, (0, 0))[1]
+        if qty > held:
+            to_hold[pid] = qty - held
+        elif qty < held:
+            to_release[pid] = held - qty
+
+    if to_hold and not inventory.reserve(to_hold):
+        db.session.rollback()
+        raise stock_error(to_hold)
+    inventory.release(to_release)
+
+    held_until = inventory.hold_expiry()
+    remove_items(cart_id, [pid for pid, qty in targets.items() if qty == 0])
+    set_items(cart_id, {pid: qty for pid, qty in targets.items() if qty > 0}, held_until)
+    db.session.execute(
+        update(CartItem)
+        .where(CartItem.cart_id == cart_id, CartItem.held_until.isnot(None))
+        .values(held_until=held_until)
+    )
+    db.session.commit()
+    return cart_id
+
+
+def cart_contents(user_id):
+    """The user's cart with product details and totals, from one joined query.
+
+    Line totals and the subtotal are computed in cents by the database; the
+    discount and tax rules then apply once to the whole cart. Returns None
+    when the user has no cart.
+    """
+    line_total = CartItem.quantity * Product.price_cents
+    rows = db.session.execute(
+        select(Cart.id, CartItem.id, CartItem.product_id, CartItem.quantity, CartItem.held_until,
+               Product.name, Product.price_cents, Product.stock, Product.reserved,
+               line_total, func.coalesce(func.sum(line_total).over(), 0))
+        .select_from(Cart)
+        .outerjoin(CartItem, CartItem.cart_id == Cart.id)
+        .outerjoin(Product, Product.id == CartItem.product_id)
+        .where(Cart.user_id == user_id)
+        .order_by(CartItem.id)
+    ).all()
+    if not rows:
+        return None
+
+    items = []
+    for cart_id, item_id, product_id, quantity, held_until, name, price, stock, reserved, line_cents, _ in rows:
+        if item_id is None:
+            continue
+        # Our own hold is already counted in reserved
+        free = stock - reserved + (quantity if held_until else 0)
+        items.append({
+            "id": item_id,
+            "product_id": product_id,
+            "name": name,
+            "unit_price": from_cents(price),
+            "quantity": quantity,
+            "line_total": from_cents(line_cents),
+            "stock": max(free, 0),
+            "available": free >= quantity,
+            "held_until": held_until.isoformat() if held_until else None,
+        })
+
+    return {
+        "cart_id": rows[0][0],
+        "items": items,
+        "item_count": sum(item["quantity"] for item in items),
+        **totals_json(price_totals(rows[0][-1])),
+        "available": all(item["available"] for item in items),
+    }
+
+
+def add_to_cart(user_id, product_id, quantity):
+    """Add one product to the user's cart, holding the stock, and commit."""
+    if not is_integer(product_id):
+        raise CartError('An integer product_id is required')
+    if not is_integer(quantity) or quantity < 1:
+        raise CartError(f'Invalid quantity for product {product_id}')
+    update_items(user_id, adds={product_id: quantity})
+
+
+def fold_operations(operations):
+    """Collapse an ordered list of cart operations into one change per product.
+
+    Each product ends up either as a relative 'add' (no set/remove seen) or
+    an absolute quantity, where 0 means the row is removed.
+    """
+    changes = {}
+    for op in operations:
+        if not isinstance(op, dict) or op.get('op') not in CART_OPS:
+            raise CartError(f"Each operation needs an 'op' of {', '.join(CART_OPS)}")
+        product_id = op.get('product_id')
+        if not is_integer(product_id):
+            raise CartError('Each operation needs an integer product_id')
+
+        base, delta = changes.get(product_id, (None, 0))
+        if op['op'] == 'remove':
+            base, delta = 0, 0
+        else:
+            quantity = op.get('quantity', 1)
+            if not is_integer(quantity) or quantity < (1 if op['op'] == 'add' else 0):
+                raise CartError(f"Invalid quantity for product {product_id}")
+            if op['op'] == 'add':
+                delta += quantity
+            else:
+                base, delta = quantity, 0
+        changes[product_id] = (base, delta)
+    return changes
+
+
+def apply_operations(user_id, operations):
+    """Apply a batch of add/set/remove operations in one transaction."""
+    changes = fold_operations(operations)
+
+    adds, sets, removes = {}, {}, []
+    for pid, (base, delta) in changes.items():
+        if base is None:
+            adds[pid] = delta
+        elif base + delta > 0:
+            sets[pid] = base + delta
+        else:
+            removes.append(pid)
+
+    return update_items(user_id, adds, sets, removes)
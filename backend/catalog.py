@@ -0,0 +1,109 @@
+from flask import jsonify
+from sqlalchemy import select
+from .models import Product, db
+from .database import read_bind
+from .pagination import page_limit, split_page, list_response
+from .pricing import from_cents, to_cents
+
+# Columns a client may ask for through ?fields=
+PRODUCT_FIELDS = ("id", "name", "price", "description", "stock", "category_id")
+
+TRUE_VALUES = ("1", "true", "yes")
+
+
+def product_column(field):
+    """The column behind an API field; "price" is stored as price_cents."""
+    return Product.price_cents if field == "price" else getattr(Product, field)
+
+
+def product_row(fields, row):
+    """A selected row as an API dict, with the price in major units."""
+    item = dict(zip(fields, row))
+    if "price" in item:
+        item["price"] = from_cents(item["price"])
+    return item
+
+
+def parse_fields(args, default_fields):
+    """Resolve the ?fields= projection, always keeping the id for the cursor."""
+    raw = args.get('fields')
+    if not raw:
+        return list(default_fields)
+
+    fields = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in PRODUCT_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+
+    if "id" not in fields:
+        fields.insert(0, "id")
+    return fields
+
+
+def price_arg(args, key):
+    """A price filter from the query string in cents, or None when absent or empty."""
+    value = args.get(key)
+    if not value:
+        return None
+    try:
+        return to_cents(value)
+    except ValueError as e:
+        raise ValueError(f'{key}: {e}')
+
+
+def product_filters(args):
+    """Build SQL filter clauses from the catalog query string; malformed values raise ValueError."""
+    clauses = []
+
+    category_id = args.get('category_id')
+    if category_id:
+        try:
+            clauses.append(Product.category_id == int(category_id))
+        except ValueError:
+            raise ValueError('category_id must be an integer')
+
+    min_price = price_arg(args, 'min_price')
+    if min_price is not None:
+        clauses.append(Product.price_cents >= min_price)
+
+    max_price = price_arg(args, 'max_price')
+    if max_price is not None:
+        clauses.append(Product.price_cents <= max_price)
+
+    if args.get('in_stock', '').lower() in TRUE_VALUES:
+        clauses.append(Product.stock > 0)
+
+    return clauses
+
+
+def product_page(args, default_fields):
+    """Return one keyset page of products and the cursor for the next one.
+
+    Pages are ordered by id; ?cursor= is the last id of the previous page.
+    Only the requested columns are selected, and the read goes to the
+    replica when one is configured.
+    """
+    fields = parse_fields(args, default_fields)
+    limit = page_limit(args)
+    cursor = args.get('cursor', type=int)
+
+    query = select(*[product_column(f) for f in fields]).where(*product_filters(args))
+    if cursor is not None:
+        query = query.where(Product.id > cursor)
+
+    # Fetch one extra row to know whether another page exists
+    query = query.order_by(Product.id).limit(limit + 1)
+    rows, has_more = split_page(db.session.execute(query, bind_arguments=read_bind()).all(), limit)
+
+    items = [product_row(fields, row) for row in rows]
+    next_cursor = items[-1]["id"] if has_more else None
+    return items, next_cursor
+
+
+def product_list_response(args, default_fields):
+    """JSON list of products for a catalog endpoint."""
+    try:
+        items, next_cursor = product_page(args, default_fields)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return list_response(items, next_cursor)
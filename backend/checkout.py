@@ -0,0 +1,143 @@
+from sqlalchemy import delete, func, insert, literal, update
+from sqlalchemy.exc import IntegrityError, OperationalError
+from .models import Cart, CartItem, Product, Order, OrderItem, db
+from .cache import response_cache
+from .jobs import enqueue
+from .inventory import availability, per_product
+from .pricing import from_cents, price_totals
+from .events import event_hub
+
+
+class CheckoutError(Exception):
+    """Raised when a cart cannot be turned into an order."""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+
+
+def load_cart_lines(cart_id):
+    """Cart items joined with their product price in a single query.
+
+    Each row also carries the cart subtotal in cents, summed by the
+    database over all lines with a window function.
+    """
+    return (
+        db.session.query(CartItem.product_id, CartItem.quantity, Product.name, Product.price_cents,
+                         func.sum(CartItem.quantity * Product.price_cents).over().label('subtotal'))
+        .join(Product, Product.id == CartItem.product_id)
+        .filter(CartItem.cart_id == cart_id)
+        .all()
+    )
+
+
+def order_snapshot(lines):
+    """Order summary columns: item count and a snapshot of the lines as bought."""
+    return {
+        'item_count': sum(line.quantity for line in lines),
+        'lines': [{'product_id': line.product_id, 'name': line.name, 'quantity': line.quantity,
+                   'price_cents': line.price_cents} for line in lines],
+    }
+
+
+def reserve_stock(quantities, held):
+    """Turn holds into stock decrements for every product in one conditional UPDATE.
+
+    quantities maps product_id -> quantity and held maps product_id -> the
+    part of it this cart already holds. A product only changes when the
+    unheld part fits in its available stock. Returns the (id, stock,
+    reserved) rows that changed, or None when some product could not be
+    covered; the caller then rolls back.
+    """
+    qty = per_product(quantities)
+    ours = per_product(held, 0) if held else literal(0)
+    rows = db.session.execute(
+        update(Product)
+        .where(Product.id.in_(quantities), Product.stock - Product.reserved + ours >= qty)
+        .values(stock=Product.stock - qty, reserved=Product.reserved - ours)
+        .returning(Product.id, Product.stock, Product.reserved)
+        .execution_options(synchronize_session=False)
+    ).all()
+    return rows if len(rows) == len(quantities) else None
+
+
+def out_of_stock(quantities, held):
+    """Ids of products whose available stock cannot cover the unheld quantity."""
+    available = availability(quantities)
+    return sorted(pid for pid, free in available.items() if free + held.get(pid, 0) < quantities[pid])
+
+
+def place_order(user_id):
+    """Turn the user's cart into an order inside one transaction.
+
+    Returns the new order. Raises CheckoutError when the cart is empty,
+    stock ran out, or a concurrent checkout got there first; in every
+    failure case nothing is written. Held lines turn from holds into stock
+    decrements; lines whose hold expired need free stock again. Invoicing
+    and other post-order work run on the job queue via the 'order.placed'
+    event.
+    """
+    cart = Cart.query.filter_by(user_id=user_id).first()
+    if not cart:
+        raise CheckoutError('Cart is empty')
+
+    lines = load_cart_lines(cart.id)
+    if not lines:
+        raise CheckoutError('Cart is empty')
+
+    try:
+        # Claim the cart first so a second checkout of the same cart finds nothing.
+        # RETURNING reports the holds as of the claim, after any sweep in between.
+        claimed = db.session.execute(
+            delete(CartItem)
+            .where(CartItem.cart_id == cart.id)
+            .returning(CartItem.product_id, CartItem.quantity, CartItem.held_until)
+        ).all()
+        expected = sorted((line.product_id, line.quantity) for line in lines)
+        if sorted((row.product_id, row.quantity) for row in claimed) != expected:
+            raise CheckoutError('Cart changed during checkout, please retry', 409)
+
+        quantities, held = {}, {}
+        for product_id, quantity, held_until in claimed:
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+            if held_until:
+                held[product_id] = held.get(product_id, 0) + quantity
+
+        levels = reserve_stock(quantities, held)
+        if levels is None:
+            db.session.rollback()
+            missing = out_of_stock(quantities, held)
+            raise CheckoutError(f'Not enough stock available for products {missing}', 409)
+
+        totals = price_totals(lines[0].subtotal)
+        order = Order(user_id=cart.user_id, subtotal_cents=totals.subtotal, discount_cents=totals.discount,
+                      tax_cents=totals.tax, total_cents=totals.total, status="Pending", **order_snapshot(lines))
+        db.session.add(order)
+        db.session.flush()
+
+        db.session.execute(insert(OrderItem), [
+            {"order_id": order.id, "product_id": line.product_id, "quantity": line.quantity,
+             "price_cents": line.price_cents}
+            for line in lines
+        ])
+
+        placed = {'order_id': order.id, 'status': order.status, 'total': from_cents(totals.total)}
+        enqueue('order.placed', {'order_id': order.id})
+        enqueue('analytics.order', {'order_id': order.id})
+        db.session.commit()
+    except CheckoutError:
+        db.session.rollback()
+        raise
+    except (IntegrityError, OperationalError):
+        # Lock timeouts and unique collisions from concurrent checkouts
+        db.session.rollback()
+        raise CheckoutError('Checkout conflict, please retry', 409)
+
+    # Stock levels are part of the cached catalog
+    response_cache.invalidate('products')
+    event_hub.publish('products', 'stock', [
+        {'id': product_id, 'stock': stock, 'available': stock - reserved} for product_id, stock, reserved in levels
+    ])
+    event_hub.publish(f'orders:{user_id}', 'order', placed)
+    return order
@@ -0,0 +1,128 @@
+from flask import request
+import zlib
+
+try:
+    import brotli
+except ImportError:  # optional; only gzip is offered without it
+    brotli = None
+
+
+def accepted_encodings(header):
+    """Content codings from an Accept-Encoding header with a non-zero q-value."""
+    accepted = {}
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return {coding for coding, q in accepted.items() if q > 0}
+
+
+def gzip_compressor(level):
+    return zlib.compressobj(level, zlib.DEFLATED, 31)  # wbits 31: gzip container
+
+
+class BrotliStream:
+    """brotli.Compressor behind the compress()/flush() interface of zlib."""
+
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.finish()
+
+
+class Compression:
+    """Negotiated gzip/brotli compression of responses.
+
+    Buffered bodies are compressed only past COMPRESS_MIN_SIZE bytes, where
+    the saving outweighs the CPU; streamed bodies are always compressed,
+    chunk by chunk, since their size is unknown. Brotli is preferred when
+    the client accepts it and the brotli package is installed.
+    """
+
+    def __init__(self, app=None):
+        self.config = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('COMPRESS_ENABLED', True)
+        app.config.setdefault('COMPRESS_MIN_SIZE', 1024)
+        app.config.setdefault('COMPRESS_MIMETYPES', ('application/json', 'application/x-ndjson', 'text/csv',
+                                                     'text/html', 'text/plain'))
+        app.config.setdefault('COMPRESS_GZIP_LEVEL', 6)
+        app.config.setdefault('COMPRESS_BROTLI_QUALITY', 4)
+        if not app.config['COMPRESS_ENABLED']:
+            return
+        self.config = app.config
+        app.after_request(self.compress_response)
+
+    def choose_encoding(self):
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding'))
+        if brotli is not None and 'br' in accepted:
+            return 'br'
+        if 'gzip' in accepted:
+            return 'gzip'
+        return None
+
+    def compressor(self, encoding):
+        if encoding == 'br':
+            return BrotliStream(self.config['COMPRESS_BROTLI_QUALITY'])
+        return gzip_compressor(self.config['COMPRESS_GZIP_LEVEL'])
+
+    def compress_response(self, response):
+        if (response.status_code < 200 or response.status_code in (204, 206, 304)
+                or response.direct_passthrough
+                or 'Content-Encoding' in response.headers
+                or response.mimetype not in self.config['COMPRESS_MIMETYPES']):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = self.choose_encoding()
+        if encoding is None:
+            return response
+
+        if response.is_streamed:
+            response.response = self.compress_stream(response.response, self.compressor(encoding))
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.config['COMPRESS_MIN_SIZE']:
+                return response
+            compressor = self.compressor(encoding)
+            response.set_data(compressor.compress(data) + compressor.flush())
+
+        response.headers['Content-Encoding'] = encoding
+        # The encoded bytes differ, so the validator can only be weak
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    @staticmethod
+    def compress_stream(chunks, compressor):
+        try:
+            for chunk in chunks:
+                if isinstance(chunk, str):
+                    chunk = chunk.encode()
+                data = compressor.compress(chunk)
+                if data:
+                    yield data
+            yield compressor.flush()
+        finally:
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+
+compression = Compression()
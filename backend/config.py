@@ -0,0 +1,115 @@
+import os
+
+
+def env_int(name, default):
+    value = os.environ.get(name)
+    return int(value) if value else default
+
+
+class Config:
+    """Default settings, overridable through environment variables."""
+
+    SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL', 'sqlite:///database.db')
+    # Optional read replica used for catalog reads (Postgres deployments)
+    DATABASE_REPLICA_URL = os.environ.get('DATABASE_REPLICA_URL')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SECRET_KEY = os.environ.get('SECRET_KEY', 'djski32jfdskjfsa0kf')
+    JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'KDS73JD9WKU0EKSNFO0DMS')
+
+    # "flask init-db" skips its table, index and admin checks while the schema
+    # fingerprint it stored last time still matches the models
+    FAST_START = os.environ.get('FAST_START', '1') == '1'
+
+    # Connection pool
+    DB_POOL_SIZE = env_int('DB_POOL_SIZE', 5)
+    DB_MAX_OVERFLOW = env_int('DB_MAX_OVERFLOW', 10)
+    DB_POOL_TIMEOUT = env_int('DB_POOL_TIMEOUT', 30)
+    DB_POOL_RECYCLE = env_int('DB_POOL_RECYCLE', 1800)
+    DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', '1') == '1'
+
+    # Postgres statement_timeout, in milliseconds (0 disables it)
+    DB_STATEMENT_TIMEOUT_MS = env_int('DB_STATEMENT_TIMEOUT_MS', 5000)
+
+    # Applied to every new SQLite connection
+    DB_SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': env_int('DB_SQLITE_MMAP_SIZE', 256 * 1024 * 1024),
+        'busy_timeout': env_int('DB_SQLITE_BUSY_TIMEOUT_MS', 5000),
+    }
+
+    # Password hashing policy: any werkzeug method string, e.g. "pbkdf2:sha256:600000"
+    PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+    PASSWORD_HASH_WORKERS = env_int('PASSWORD_HASH_WORKERS', os.cpu_count() or 2)
+    PASSWORD_HASH_QUEUE = env_int('PASSWORD_HASH_QUEUE', 32)
+
+    # Background job queue
+    JOB_MAX_ATTEMPTS = env_int('JOB_MAX_ATTEMPTS', 5)
+    JOB_BACKOFF_BASE = env_int('JOB_BACKOFF_BASE', 2)
+    JOB_BACKOFF_CAP = env_int('JOB_BACKOFF_CAP', 300)
+    JOB_VISIBILITY_TIMEOUT = env_int('JOB_VISIBILITY_TIMEOUT', 300)
+    # Finished jobs are deleted after JOB_RETENTION_DAYS (0 keeps them); failed ones are kept
+    JOB_RETENTION_DAYS = env_int('JOB_RETENTION_DAYS', 7)
+    JOB_PURGE_INTERVAL = env_int('JOB_PURGE_INTERVAL', 3600)
+    JOB_PURGE_BATCH = env_int('JOB_PURGE_BATCH', 1000)
+    INVOICE_DIR = os.environ.get('INVOICE_DIR')  # defaults to <instance>/invoices
+
+    # Cart stock holds and the sweeper that expires them
+    CART_HOLD_SECONDS = env_int('CART_HOLD_SECONDS', 900)
+    HOLD_SWEEP_INTERVAL = env_int('HOLD_SWEEP_INTERVAL', 60)
+    HOLD_SWEEP_BATCH = env_int('HOLD_SWEEP_BATCH', 500)
+
+    # Order archival: orders older than ORDER_ARCHIVE_AFTER_DAYS (0 disables) move to
+    # archived_order, or to a SQLite file attached on demand when ORDER_ARCHIVE_PATH is set
+    ORDER_ARCHIVE_AFTER_DAYS = env_int('ORDER_ARCHIVE_AFTER_DAYS', 365)
+    ORDER_ARCHIVE_INTERVAL = env_int('ORDER_ARCHIVE_INTERVAL', 3600)
+    ORDER_ARCHIVE_BATCH = env_int('ORDER_ARCHIVE_BATCH', 500)
+    ORDER_ARCHIVE_PATH = os.environ.get('ORDER_ARCHIVE_PATH')
+
+    # Response cache for catalog GETs. memory is per worker process: other workers miss
+    # invalidations, so there entries and version stamps live at most CACHE_MEMORY_TTL
+    # seconds; redis shares them and honours CACHE_TTL across all workers
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')  # memory, redis or none
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_TTL = env_int('CACHE_TTL', 300)
+    CACHE_MEMORY_TTL = env_int('CACHE_MEMORY_TTL', 10)
+    CACHE_MAX_ENTRIES = env_int('CACHE_MAX_ENTRIES', 1024)
+
+    # JSON encoding (auto picks orjson when installed) and response compression
+    JSON_PROVIDER = os.environ.get('JSON_PROVIDER', 'auto')
+    COMPRESS_ENABLED = os.environ.get('COMPRESS_ENABLED', '1') == '1'
+    COMPRESS_MIN_SIZE = env_int('COMPRESS_MIN_SIZE', 1024)
+    COMPRESS_GZIP_LEVEL = env_int('COMPRESS_GZIP_LEVEL', 6)
+    COMPRESS_BROTLI_QUALITY = env_int('COMPRESS_BROTLI_QUALITY', 4)
+
+    # Pricing, in integer cents and basis points: tax on the discounted subtotal, and
+    # cart-level discount tiers as "min_subtotal_cents:bps,..." e.g. "5000:500,10000:1000"
+    PRICING_TAX_BPS = env_int('PRICING_TAX_BPS', 0)
+    PRICING_DISCOUNT_TIERS = os.environ.get('PRICING_DISCOUNT_TIERS', '')
+
+    # Server-sent events (/events): memory serves one process, redis fans out across workers
+    EVENTS_BACKEND = os.environ.get('EVENTS_BACKEND', 'memory')  # memory, redis or none
+    EVENTS_REDIS_URL = os.environ.get('EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+    EVENTS_HEARTBEAT = env_int('EVENTS_HEARTBEAT', 15)
+    # Each open stream holds a server thread, so by default streams may use all but
+    # EVENTS_RESERVED_THREADS of the WEB_THREADS each process runs (see gunicorn.conf.py)
+    EVENTS_RESERVED_THREADS = env_int('EVENTS_RESERVED_THREADS', 2)
+    EVENTS_MAX_CONNECTIONS = env_int(  # per process
+        'EVENTS_MAX_CONNECTIONS', max(env_int('WEB_THREADS', 4) - EVENTS_RESERVED_THREADS, 0))
+    EVENTS_MAX_STREAM_SECONDS = env_int('EVENTS_MAX_STREAM_SECONDS', 300)
+
+    # Token-bucket rate limits per route group, as "count/seconds[:burst]"; empty disables a group
+    RATELIMIT_BACKEND = os.environ.get('RATELIMIT_BACKEND', 'memory')  # memory, redis or none
+    RATELIMIT_REDIS_URL = os.environ.get('RATELIMIT_REDIS_URL', 'redis://localhost:6379/0')
+    RATELIMIT_PROXY_HOPS = env_int('RATELIMIT_PROXY_HOPS', 0)  # trusted proxies setting X-Forwarded-For
+    RATELIMIT_LIMITS = {
+        'auth': os.environ.get('RATELIMIT_AUTH', '10/60:20'),
+        'cart': os.environ.get('RATELIMIT_CART', '120/60'),
+        'checkout': os.environ.get('RATELIMIT_CHECKOUT', '10/60'),
+    }
+
+    # Request metrics (/metrics) and slow-request logging
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') == '1'
+    METRICS_SERVER_TIMING = os.environ.get('METRICS_SERVER_TIMING', '0') == '1'
+    METRICS_SLOW_REQUEST_MS = env_int('METRICS_SLOW_REQUEST_MS', 500)
+    METRICS_SLOW_SQL_COUNT = env_int('METRICS_SLOW_SQL_COUNT', 20)
@@ -0,0 +1,107 @@
+from sqlalchemy import event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.schema import CreateIndex, CreateTable
+from .models import SchemaVersion, db
+import hashlib
+
+
+def engine_options(config, uri):
+    """SQLAlchemy engine options for a database URI, built from app config."""
+    url = make_url(uri)
+    options = {'pool_pre_ping': config['DB_POOL_PRE_PING']}
+
+    if url.get_backend_name() == 'sqlite':
+        # In-memory databases run on a StaticPool, which takes no pool sizing
+        if url.database in (None, '', ':memory:'):
+            return options
+        busy_ms = config['DB_SQLITE_PRAGMAS'].get('busy_timeout', 5000)
+        options['connect_args'] = {'timeout': busy_ms / 1000}
+
+    options.update(
+        pool_size=config['DB_POOL_SIZE'],
+        max_overflow=config['DB_MAX_OVERFLOW'],
+        pool_timeout=config['DB_POOL_TIMEOUT'],
+        pool_recycle=config['DB_POOL_RECYCLE'],
+    )
+
+    if url.get_backend_name() == 'postgresql' and config['DB_STATEMENT_TIMEOUT_MS']:
+        options['connect_args'] = {'options': f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT_MS']}"}
+
+    return options
+
+
+def configure_database(app):
+    """Fill in engine options and binds before db.init_app runs."""
+    config = app.config
+    if 'SQLALCHEMY_ENGINE_OPTIONS' not in config:
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(config, config['SQLALCHEMY_DATABASE_URI'])
+
+    replica_url = config.get('DATABASE_REPLICA_URL')
+    if replica_url:
+        binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+        binds.setdefault('replica', {'url': replica_url, **engine_options(config, replica_url)})
+        config['SQLALCHEMY_BINDS'] = binds
+
+
+def set_sqlite_pragmas(pragmas):
+    """Connect listener running PRAGMA statements on each new connection."""
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+    return on_connect
+
+
+def register_engine_events(app):
+    """Attach connect hooks to every engine; needs an app context."""
+    for engine in db.engines.values():
+        if engine.dialect.name == 'sqlite':
+            event.listen(engine, 'connect', set_sqlite_pragmas(app.config['DB_SQLITE_PRAGMAS']))
+
+
+def read_bind():
+    """bind_arguments sending a read to the replica when one is configured."""
+    engine = db.engines.get('replica')
+    return {'bind': engine} if engine is not None else {}
+
+
+def upsert(model):
+    """INSERT construct supporting ON CONFLICT for the active dialect."""
+    if db.session.get_bind().dialect.name == 'postgresql':
+        return postgresql.insert(model)
+    return sqlite.insert(model)
+
+
+# -----------------------------------
+# SCHEMA VERSION
+# -----------------------------------
+def schema_fingerprint(dialect, extra_ddl=()):
+    """Hash of the DDL for every mapped table and index, plus extra_ddl, on this dialect."""
+    digest = hashlib.sha256()
+    for table in sorted(db.metadata.tables.values(), key=lambda t: t.name):
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    for statement in extra_ddl:
+        digest.update(statement.encode())
+    return digest.hexdigest()
+
+
+def stored_fingerprint():
+    """Fingerprint saved by the last schema check, or None if there is none yet.
+
+    Read on its own connection, so a missing table leaves the session untouched.
+    """
+    try:
+        with db.engine.connect() as connection:
+            return connection.scalar(select(SchemaVersion.fingerprint).where(SchemaVersion.id == 1))
+    except (OperationalError, ProgrammingError):
+        return None
+
+
+def store_fingerprint(fingerprint):
+    """Record the fingerprint in the current session; the caller commits."""
+    db.session.merge(SchemaVersion(id=1, fingerprint=fingerprint))
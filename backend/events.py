@@ -0,0 +1,274 @@
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from collections import deque
+from .pricing import from_cents
+from .serving import draining
+import json
+import threading
+import time
+
+events = Blueprint('events', __name__)
+
+PUBLIC_CHANNELS = ('products',)
+# Sent instead of the queued frames when a client fell behind; it should refetch
+RESYNC_FRAME = 'event: resync\ndata: {}\n\n'
+
+
+class Subscription:
+    """One client's pending frames.
+
+    The queue is bounded: a slow client loses its oldest frames and gets a
+    resync event instead of growing memory.
+    """
+    __slots__ = ('channels', 'frames', 'ready', 'overflowed')
+
+    def __init__(self, channels, size):
+        self.channels = channels
+        self.frames = deque(maxlen=size)
+        self.ready = threading.Event()
+        self.overflowed = False
+
+    def push(self, frame):
+        if len(self.frames) == self.frames.maxlen:
+            self.overflowed = True
+        self.frames.append(frame)
+        self.ready.set()
+
+    def wait(self, timeout):
+        """Frames queued so far, waiting up to timeout for the first one."""
+        self.ready.wait(timeout)
+        self.ready.clear()
+        frames = []
+        while self.frames:
+            frames.append(self.frames.popleft())
+        return frames
+
+
+class RedisFanout:
+    """Relays events between processes over a Redis-protocol pub/sub channel.
+
+    Works with any client exposing redis-py's publish() and pubsub().
+    """
+
+    def __init__(self, client, channel='raasan:events'):
+        self.client = client
+        self.channel = channel
+
+    def publish(self, message):
+        self.client.publish(self.channel, message)
+
+    def listen(self, deliver, logger):
+        """Feed every message to deliver(), reconnecting with backoff; runs forever."""
+        delay = 1
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                delay = 1
+                for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        deliver(**json.loads(message['data']))
+            except Exception:
+                logger.exception('Event fan-out listener failed; reconnecting in %ss', delay)
+                time.sleep(delay)
+                delay = min(delay * 2, 30)
+
+
+class EventHub:
+    """In-process pub/sub feeding the /events server-sent event streams.
+
+    Publishers call publish(channel, event, data) after their commit. Each
+    event is encoded once into an SSE frame shared by every subscriber; a
+    short backlog lets reconnecting clients resume from Last-Event-ID. With
+    the redis backend, events go through a pub/sub channel so subscribers
+    in every worker (and events from job workers) are reached.
+    """
+
+    def __init__(self, app=None):
+        self.enabled = False
+        self.fanout = None
+        self.config = None
+        self._lock = threading.Lock()
+        self._subscribers = {}
+        self._count = 0
+        self._backlog = deque()
+        self._last_id = 0
+        self._listener = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('EVENTS_BACKEND', 'memory')  # memory, redis or none
+        app.config.setdefault('EVENTS_REDIS_URL', 'redis://localhost:6379/0')
+        app.config.setdefault('EVENTS_REDIS_CLIENT', None)
+        app.config.setdefault('EVENTS_QUEUE_SIZE', 64)
+        app.config.setdefault('EVENTS_BACKLOG', 256)
+        app.config.setdefault('EVENTS_HEARTBEAT', 15)
+        app.config.setdefault('EVENTS_MAX_CONNECTIONS', 2)  # leave threads for ordinary requests
+        app.config.setdefault('EVENTS_MAX_STREAM_SECONDS', 300)
+
+        kind = app.config['EVENTS_BACKEND']
+        if kind == 'redis':
+            client = app.config['EVENTS_REDIS_CLIENT']
+            if client is None:
+                try:
+                    import redis
+                except ImportError:
+                    raise RuntimeError("EVENTS_BACKEND='redis' requires the redis package")
+                client = redis.Redis.from_url(app.config['EVENTS_REDIS_URL'])
+            self.fanout = RedisFanout(client)
+        elif kind not in ('memory', 'none'):
+            raise ValueError(f"Unknown EVENTS_BACKEND: {kind}")
+
+        self.enabled = kind != 'none'
+        self.config = app.config
+        self._backlog = deque(maxlen=app.config['EVENTS_BACKLOG'])
+
+    # -----------------------------------
+    # PUBLISHING
+    # -----------------------------------
+    def next_id(self):
+        """Event ids are nanosecond timestamps, so ids from different processes interleave in order."""
+        with self._lock:
+            self._last_id = max(self._last_id + 1, time.time_ns())
+            return self._last_id
+
+    def publish(self, channel, event, data):
+        """Send an event to the channel's subscribers. Call after the change is committed."""
+        if not self.enabled:
+            return
+        message = {'id': self.next_id(), 'channel': channel, 'event': event, 'data': current_app.json.dumps(data)}
+        if self.fanout is None:
+            self.deliver(**message)
+            return
+        try:
+            self.fanout.publish(json.dumps(message))
+        except Exception:
+            # Live updates are best effort; clients resync on reconnect
+            current_app.logger.exception('Event fan-out unavailable; dropping %s event', event)
+
+    def deliver(self, id, channel, event, data):
+        frame = f'id: {id}\nevent: {event}\ndata: {data}\n\n'
+        with self._lock:
+            self._backlog.append((id, channel, frame))
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.push(frame)
+
+    # -----------------------------------
+    # SUBSCRIBING
+    # -----------------------------------
+    def subscribe(self, channels, last_event_id=None):
+        """Register a subscription, or return None when the process is at EVENTS_MAX_CONNECTIONS.
+
+        Events after last_event_id still in the backlog are queued first; if
+        the backlog cannot prove nothing was missed, the client gets resync.
+        """
+        subscription = Subscription(frozenset(channels), self.config['EVENTS_QUEUE_SIZE'])
+        with self._lock:
+            if self._count >= self.config['EVENTS_MAX_CONNECTIONS']:
+                return None
+            self._count += 1
+            for channel in subscription.channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+
+            if last_event_id is not None:
+                if not self._backlog or self._backlog[0][0] > last_event_id:
+                    subscription.overflowed = True
+                for event_id, channel, frame in self._backlog:
+                    if event_id > last_event_id and channel in subscription.channels:
+                        subscription.push(frame)
+
+            if self.fanout is not None and self._listener is None:
+                # Started on first use, so a preloading parent never owns the thread
+                self._listener = threading.Thread(
+                    target=self.fanout.listen, args=(self.deliver, current_app.logger),
+                    name='event-fanout', daemon=True,
+                )
+                self._listener.start()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._count -= 1
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def stream(self, subscription):
+        """SSE body for one subscription.
+
+        Comments keep idle connections alive every EVENTS_HEARTBEAT seconds.
+        The stream ends on drain or after EVENTS_MAX_STREAM_SECONDS, and the
+        client reconnects with Last-Event-ID, so long-lived connections
+        never pin a worker thread indefinitely.
+        """
+        heartbeat = self.config['EVENTS_HEARTBEAT']
+        deadline = time.monotonic() + self.config['EVENTS_MAX_STREAM_SECONDS']
+        yield 'retry: 3000\n\n'
+        while not draining.is_set() and time.monotonic() < deadline:
+            frames = subscription.wait(heartbeat)
+            if subscription.overflowed:
+                subscription.overflowed = False
+                frames = [RESYNC_FRAME]
+            yield ''.join(frames) if frames else ': keepalive\n\n'
+
+
+event_hub = EventHub()
+
+
+def product_delta(product):
+    """Compact 'product' event payload."""
+    return {
+        'id': product.id,
+        'name': product.name,
+        'price': from_cents(product.price_cents),
+        'stock': product.stock,
+        'available': product.stock - (product.reserved or 0),
+    }
+
+
+# -----------------------------------
+# STREAM
+# -----------------------------------
+@events.route('/events', methods=['GET'])
+def stream_events():
+    """Server-sent event stream of live updates.
+
+    ?channels= is a comma-separated list of "products" (stock and price
+    changes, public) and "orders" (the caller's order and invoice status,
+    needs a JWT). Resumes from the Last-Event-ID header after a reconnect.
+    """
+    if not event_hub.enabled:
+        return jsonify({'error': 'Event stream is disabled'}), 404
+    if not request.environ.get('wsgi.multithread'):
+        # On a sync worker the stream would hold its only thread until the worker is killed
+        return jsonify({'error': 'Event streams need a threaded server (WEB_THREADS > 1)'}), 503
+
+    requested = {c.strip() for c in request.args.get('channels', 'products').split(',') if c.strip()}
+    unknown = requested - {*PUBLIC_CHANNELS, 'orders'}
+    if unknown or not requested:
+        return jsonify({'error': f"Unknown channels: {', '.join(sorted(unknown))}" if unknown else 'No channels'}), 400
+
+    channels = requested & set(PUBLIC_CHANNELS)
+    if 'orders' in requested:
+        verify_jwt_in_request()
+        channels.add(f'orders:{get_jwt_identity()}')
+
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    subscription = event_hub.subscribe(channels, last_event_id)
+    if subscription is None:
+        response = jsonify({'error': 'Too many event streams, please retry later'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '5'
+        return response
+
+    response = Response(event_hub.stream(subscription), mimetype='text/event-stream')
+    # Runs on disconnect too, even if the stream never started
+    response.call_on_close(lambda: event_hub.unsubscribe(subscription))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # keep nginx from buffering the stream
+    return response
@@ -0,0 +1,42 @@
+from flask import jsonify
+from flask_jwt_extended import get_jwt, get_jwt_identity, jwt_required
+from functools import wraps
+from .models import User, UserRole
+from . import jwt
+
+
+@jwt.user_identity_loader
+def user_identity(user):
+    """Tokens carry the user id as a string subject."""
+    return str(user.id) if isinstance(user, User) else str(user)
+
+
+@jwt.additional_claims_loader
+def role_claims(user):
+    """Embed the role so role checks never need a User query."""
+    if isinstance(user, User):
+        return {'role': user.role.value}
+    return {}
+
+
+def current_user_id():
+    """Id of the authenticated user, read straight from the token."""
+    return int(get_jwt_identity())
+
+
+def role_required(*roles):
+    """Require a valid JWT whose role claim is one of roles."""
+    allowed = {role.value for role in roles}
+
+    def decorator(view):
+        @wraps(view)
+        @jwt_required()
+        def wrapper(*args, **kwargs):
+            if get_jwt().get('role') not in allowed:
+                return jsonify({'error': 'Unauthorized'}), 403
+            return view(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+admin_required = role_required(UserRole.ADMIN)
@@ -0,0 +1,146 @@
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import case, func, select, update
+from .models import CartItem, Job, Product, db
+from .jobs import handler, enqueue
+from datetime import datetime, timedelta
+import click
+
+
+# -----------------------------------
+# HOLDS
+# -----------------------------------
+def hold_expiry():
+    """When a hold placed or refreshed now runs out."""
+    return datetime.utcnow() + timedelta(seconds=current_app.config['CART_HOLD_SECONDS'])
+
+
+def per_product(quantities, default=None):
+    """CASE expression mapping Product.id to its quantity."""
+    return case(quantities, value=Product.id, else_=default)
+
+
+def reserve(quantities):
+    """Hold quantities (product_id -> qty) against available stock in one UPDATE.
+
+    Only rows with stock - reserved >= qty change, so a short rowcount means
+    some product could not be covered; the caller must then roll back.
+    """
+    qty = per_product(quantities)
+    result = db.session.execute(
+        update(Product)
+        .where(Product.id.in_(quantities), Product.stock - Product.reserved >= qty)
+        .values(reserved=Product.reserved + qty)
+        .execution_options(synchronize_session=False)
+    )
+    return result.rowcount == len(quantities)
+
+
+def release(quantities):
+    """Give held quantities (product_id -> qty) back to available stock."""
+    if not quantities:
+        return
+    qty = per_product(quantities, 0)
+    db.session.execute(
+        update(Product)
+        .where(Product.id.in_(quantities))
+        .values(reserved=case((Product.reserved > qty, Product.reserved - qty), else_=0))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def availability(product_ids):
+    """product_id -> units not held by any cart, for the given products."""
+    return dict(db.session.execute(
+        select(Product.id, Product.stock - Product.reserved).where(Product.id.in_(product_ids))
+    ).all())
+
+
+# -----------------------------------
+# EXPIRY SWEEPER
+# -----------------------------------
+def release_expired(batch_size=None):
+    """Release every hold past its expiry, one committed batch at a time.
+
+    Each batch is claimed with UPDATE ... RETURNING, so holds that a
+    checkout or cart change got to first are never released twice.
+    Returns the number of cart items released.
+    """
+    batch_size = batch_size or current_app.config['HOLD_SWEEP_BATCH']
+    released = 0
+    while True:
+        now = datetime.utcnow()
+        batch = (
+            select(CartItem.id)
+            .where(CartItem.held_until < now)
+            .order_by(CartItem.held_until)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        rows = db.session.execute(
+            update(CartItem)
+            .where(CartItem.id.in_(batch), CartItem.held_until < now)
+            .values(held_until=None)
+            .returning(CartItem.product_id, CartItem.quantity)
+            .execution_options(synchronize_session=False)
+        ).all()
+
+        quantities = {}
+        for product_id, quantity in rows:
+            quantities[product_id] = quantities.get(product_id, 0) + quantity
+        release(quantities)
+        db.session.commit()
+
+        released += len(rows)
+        if len(rows) < batch_size:
+            return released
+
+
+def schedule_sweep(delay=0):
+    """Queue the next sweep unless one is already waiting."""
+    pending = db.session.execute(
+        select(Job.id).where(Job.kind == 'inventory.sweep', Job.status == 'queued').limit(1)
+    ).first()
+    if pending is None:
+        enqueue('inventory.sweep', delay=delay)
+
+
+@handler('inventory.sweep')
+def sweep(payload):
+    """Expire abandoned holds, then schedule the next run."""
+    release_expired()
+    schedule_sweep(current_app.config['HOLD_SWEEP_INTERVAL'])
+
+
+def reconcile_reserved():
+    """Recompute every Product.reserved from the active holds.
+
+    The counters are maintained incrementally; this full pass is the repair
+    tool for drift, not part of any request path.
+    """
+    held = (
+        select(func.coalesce(func.sum(CartItem.quantity), 0))
+        .where(CartItem.product_id == Product.id, CartItem.held_until.isnot(None))
+        .scalar_subquery()
+    )
+    result = db.session.execute(
+        update(Product).where(Product.reserved != held).values(reserved=held)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+    return result.rowcount
+
+
+inventory_cli = AppGroup('inventory', help='Cart holds on stock.')
+
+
+@inventory_cli.command('sweep')
+def sweep_command():
+    """Release expired cart holds now."""
+    click.echo(f'Released {release_expired()} expired holds')
+
+
+@inventory_cli.command('reconcile')
+def reconcile_command():
+    """Recompute reserved counters from the active holds."""
+    click.echo(f'Corrected {reconcile_reserved()} products')
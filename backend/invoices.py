@@ -0,0 +1,89 @@
+from flask import current_app, render_template_string
+from sqlalchemy.orm import joinedload
+from .models import Order, OrderItem, Invoice, db
+from .jobs import handler, enqueue
+from .pricing import format_cents
+from .events import event_hub
+import os
+
+INVOICE_TEMPLATE = """<!doctype html>
+<html>
+<head><meta charset="utf-8"><title>Invoice {{ invoice.invoice_number }}</title></head>
+<body>
+  <h1>Invoice {{ invoice.invoice_number }}</h1>
+  <p>Order #{{ order.id }} &middot; {{ order.created_at.strftime('%Y-%m-%d %H:%M') }} UTC</p>
+  <table>
+    <tr><th>Product</th><th>Qty</th><th>Unit price</th><th>Line total</th></tr>
+    {% for item in order.order_items %}
+    <tr>
+      <td>{{ item.product.name if item.product else item.product_id }}</td>
+      <td>{{ item.quantity }}</td>
+      <td>{{ money(item.price_cents) }}</td>
+      <td>{{ money(item.price_cents * item.quantity) }}</td>
+    </tr>
+    {% endfor %}
+  </table>
+  <p>Subtotal: {{ money(order.subtotal_cents) }}</p>
+  {% if order.discount_cents %}<p>Discount: -{{ money(order.discount_cents) }}</p>{% endif %}
+  {% if order.tax_cents %}<p>Tax: {{ money(order.tax_cents) }}</p>{% endif %}
+  <p><strong>Total: {{ money(order.total_cents) }}</strong></p>
+</body>
+</html>
+"""
+
+
+def invoice_number_for(order):
+    """Invoice numbers derive from the order id, so they cannot collide."""
+    return f"INV-{order.created_at:%Y%m%d}-{order.id:08d}"
+
+
+def invoice_dir():
+    path = current_app.config.get('INVOICE_DIR') or os.path.join(current_app.instance_path, 'invoices')
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+@handler('order.placed')
+def create_invoice(payload):
+    """Issue the invoice row for a new order and queue its rendering."""
+    order = db.session.get(Order, payload['order_id'])
+    if order is None or order.invoice is not None:
+        return  # deleted, or already handled by an earlier attempt
+
+    invoice = {'order_id': order.id, 'invoice_number': invoice_number_for(order), 'status': "Pending"}
+    channel = f'orders:{order.user_id}'
+    db.session.add(Invoice(**invoice))
+    enqueue('invoice.render', {'order_id': order.id})
+    db.session.commit()
+    event_hub.publish(channel, 'invoice', invoice)
+
+
+@handler('invoice.render')
+def render_invoice(payload):
+    """Render the invoice to HTML on disk and mark it Issued."""
+    order = (
+        Order.query
+        .options(joinedload(Order.order_items).joinedload(OrderItem.product), joinedload(Order.invoice))
+        .filter(Order.id == payload['order_id'])
+        .first()
+    )
+    if order is None or order.invoice is None:
+        return
+
+    invoice = order.invoice
+    html = render_template_string(INVOICE_TEMPLATE, order=order, invoice=invoice, money=format_cents)
+
+    # Write then rename, so a half-written file is never served
+    path = os.path.join(invoice_dir(), f'{invoice.invoice_number}.html')
+    with open(path + '.tmp', 'w', encoding='utf-8') as f:
+        f.write(html)
+    os.replace(path + '.tmp', path)
+
+    issued = None
+    if invoice.status == "Pending":
+        invoice.status = "Issued"
+        issued = {'order_id': order.id, 'invoice_number': invoice.invoice_number, 'status': invoice.status}
+    channel = f'orders:{order.user_id}'
+    db.session.commit()
+    if issued:
+        event_hub.publish(channel, 'invoice', issued)
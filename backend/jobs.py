@@ -0,0 +1,228 @@
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import delete, select, update
+from .models import Job, db
+from datetime import datetime, timedelta
+import click
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import threading
+import traceback
+
+# kind -> callable(payload); handlers register themselves with @handler
+HANDLERS = {}
+
+
+def handler(kind):
+    """Register the function that runs jobs of this kind.
+
+    Changes a handler leaves uncommitted are committed together with the
+    job's 'done' status, so they are applied exactly once.
+    """
+    def decorator(fn):
+        HANDLERS[kind] = fn
+        return fn
+    return decorator
+
+
+def enqueue(kind, payload=None, delay=0, max_attempts=None):
+    """Add a job to the current session.
+
+    Nothing is committed here: the job becomes visible to workers together
+    with the caller's own writes, or not at all if the caller rolls back.
+    """
+    job = Job(
+        kind=kind,
+        payload=payload or {},
+        run_at=datetime.utcnow() + timedelta(seconds=delay),
+        max_attempts=max_attempts or current_app.config['JOB_MAX_ATTEMPTS'],
+    )
+    db.session.add(job)
+    return job
+
+
+def backoff(attempts):
+    """Seconds before retry number attempts: exponential, capped, with jitter."""
+    config = current_app.config
+    delay = min(config['JOB_BACKOFF_CAP'], config['JOB_BACKOFF_BASE'] * 2 ** (attempts - 1))
+    return delay * random.uniform(0.5, 1.0)
+
+
+def requeue_stale():
+    """Return jobs held by crashed workers to the queue."""
+    cutoff = datetime.utcnow() - timedelta(seconds=current_app.config['JOB_VISIBILITY_TIMEOUT'])
+    db.session.execute(
+        update(Job)
+        .where(Job.status == 'running', Job.locked_at < cutoff)
+        .values(status='queued', locked_by=None, locked_at=None)
+    )
+    db.session.commit()
+
+
+def claim_next(worker_id):
+    """Atomically take the oldest due job, or return None.
+
+    The conditional UPDATE only succeeds for one worker per job, so no
+    row locks (or SKIP LOCKED support) are needed.
+    """
+    now = datetime.utcnow()
+    candidates = db.session.execute(
+        select(Job.id).where(Job.status == 'queued', Job.run_at <= now).order_by(Job.run_at, Job.id).limit(5)
+    ).scalars().all()
+
+    for job_id in candidates:
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == 'queued')
+            .values(status='running', locked_by=worker_id, locked_at=now, attempts=Job.attempts + 1)
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(Job, job_id)
+    return None
+
+
+def run_job(job):
+    """Run one claimed job and record success, a scheduled retry, or failure."""
+    try:
+        fn = HANDLERS.get(job.kind)
+        if fn is None:
+            raise LookupError(f'No handler registered for {job.kind}')
+        fn(job.payload)
+    except Exception:
+        db.session.rollback()
+        job = db.session.get(Job, job.id)
+        job.last_error = traceback.format_exc(limit=5)
+        job.locked_by = job.locked_at = None
+        if job.attempts >= job.max_attempts:
+            job.status = 'failed'
+        else:
+            job.status = 'queued'
+            job.run_at = datetime.utcnow() + timedelta(seconds=backoff(job.attempts))
+        db.session.commit()
+        return False
+
+    job.status = 'done'
+    job.locked_by = job.locked_at = None
+    db.session.commit()
+    return True
+
+
+def purge_done(before=None, batch_size=None):
+    """Delete finished jobs that ran before the cutoff, one committed batch at a time.
+
+    Failed jobs are kept for inspection. Returns the number of jobs deleted.
+    """
+    config = current_app.config
+    if before is None:
+        before = datetime.utcnow() - timedelta(days=config['JOB_RETENTION_DAYS'])
+    batch_size = batch_size or config['JOB_PURGE_BATCH']
+
+    purged = 0
+    while True:
+        batch = select(Job.id).where(Job.status == 'done', Job.run_at < before).limit(batch_size)
+        deleted = db.session.execute(
+            delete(Job).where(Job.id.in_(batch.scalar_subquery())).execution_options(synchronize_session=False)
+        ).rowcount
+        db.session.commit()
+        purged += deleted
+        if deleted < batch_size:
+            return purged
+
+
+def schedule_purge(delay=0):
+    """Queue the next purge unless retention is disabled or a purge is already waiting."""
+    if current_app.config['JOB_RETENTION_DAYS'] <= 0:
+        return
+    pending = db.session.execute(
+        select(Job.id).where(Job.kind == 'jobs.purge', Job.status == 'queued').limit(1)
+    ).first()
+    if pending is None:
+        enqueue('jobs.purge', delay=delay)
+
+
+@handler('jobs.purge')
+def purge(payload):
+    """Delete old finished jobs, then schedule the next run."""
+    if current_app.config['JOB_RETENTION_DAYS'] > 0:
+        purge_done()
+    schedule_purge(current_app.config['JOB_PURGE_INTERVAL'])
+
+
+def work(app, worker_id, stop, poll_interval=1.0, burst=False):
+    """Process jobs until stop is set (or the queue is empty in burst mode)."""
+    with app.app_context():
+        requeue_stale()
+        idle_polls = 0
+        while not stop.is_set():
+            job = claim_next(worker_id)
+            if job is None:
+                if burst:
+                    return
+                idle_polls += 1
+                # Sweep for abandoned jobs roughly once a minute while idle
+                if idle_polls * poll_interval >= 60:
+                    requeue_stale()
+                    idle_polls = 0
+                stop.wait(poll_interval)
+                continue
+            run_job(job)
+            db.session.remove()
+
+
+def worker_process(index, poll_interval, burst):
+    """Entry point of one worker process; exits cleanly on SIGTERM/SIGINT."""
+    from . import create_app
+
+    stop = threading.Event()
+    signal.signal(signal.SIGTERM, lambda *_: stop.set())
+    signal.signal(signal.SIGINT, lambda *_: stop.set())
+    worker_id = f'{socket.gethostname()}:{os.getpid()}:{index}'
+    work(create_app(), worker_id, stop, poll_interval, burst)
+
+
+jobs_cli = AppGroup('jobs', help='Background job queue.')
+
+
+@jobs_cli.command('work')
+@click.option('--processes', default=1, show_default=True, help='Worker processes to start.')
+@click.option('--poll-interval', default=1.0, show_default=True, help='Seconds between polls when idle.')
+@click.option('--burst', is_flag=True, help='Exit once the queue is empty.')
+def work_command(processes, poll_interval, burst):
+    """Run background job workers."""
+    workers = [
+        multiprocessing.Process(target=worker_process, args=(i, poll_interval, burst), name=f'job-worker-{i}')
+        for i in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    try:
+        for worker in workers:
+            worker.join()
+    except KeyboardInterrupt:
+        for worker in workers:
+            worker.terminate()
+            worker.join()
+
+
+@jobs_cli.command('status')
+def status_command():
+    """Show job counts by kind and status."""
+    rows = db.session.execute(
+        select(Job.kind, Job.status, db.func.count()).group_by(Job.kind, Job.status).order_by(Job.kind)
+    ).all()
+    for kind, status, count in rows:
+        click.echo(f'{kind:<24} {status:<8} {count}')
+
+
+@jobs_cli.command('purge')
+@click.option('--days', type=int, default=None,
+              help='Delete finished jobs older than this many days (default JOB_RETENTION_DAYS).')
+def purge_command(days):
+    """Delete old finished jobs now."""
+    days = current_app.config['JOB_RETENTION_DAYS'] if days is None else days
+    purged = purge_done(before=datetime.utcnow() - timedelta(days=days))
+    click.echo(f'Deleted {purged} finished jobs older than {days} days')
@@ -0,0 +1,170 @@
+from flask import Response, g, request, has_request_context
+from sqlalchemy import event
+from .models import db
+import threading
+import time
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SQL_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+
+class Histogram:
+    """Cumulative Prometheus-style histogram for one label set."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+
+def format_labels(labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return ','.join(f'{k}="{escape(v)}"' for k, v in labels)
+
+
+class Metrics:
+    """Per-endpoint request metrics exposed at /metrics in Prometheus text format.
+
+    Latency, SQL statement count and time (from engine cursor events) and
+    response size are recorded for every request. Each process keeps its own
+    registry, so with several workers each one must be scraped.
+    """
+
+    HISTOGRAMS = {
+        'http_request_duration_seconds': ('Request latency in seconds.', LATENCY_BUCKETS),
+        'http_request_sql_statements': ('SQL statements executed per request.', SQL_COUNT_BUCKETS),
+        'http_request_sql_duration_seconds': ('Time spent in SQL per request, in seconds.', LATENCY_BUCKETS),
+        'http_response_size_bytes': ('Response body size in bytes.', SIZE_BUCKETS),
+    }
+
+    def __init__(self, app=None):
+        self.lock = threading.Lock()
+        self.requests = {}
+        self.histograms = {name: {} for name in self.HISTOGRAMS}
+        self.counters = {}  # name -> (help text, {labels: value})
+        self.logger = None
+        self.config = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('METRICS_ENABLED', True)
+        app.config.setdefault('METRICS_SERVER_TIMING', False)
+        app.config.setdefault('METRICS_SLOW_REQUEST_MS', 500)
+        app.config.setdefault('METRICS_SLOW_SQL_COUNT', 20)
+        if not app.config['METRICS_ENABLED']:
+            return
+
+        self.config = app.config
+        self.logger = app.logger
+        app.before_request(self.start_request)
+        app.after_request(self.finish_request)
+        app.add_url_rule('/metrics', 'metrics', self.metrics_view, methods=['GET'])
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, 'before_cursor_execute', self.before_cursor_execute)
+                event.listen(engine, 'after_cursor_execute', self.after_cursor_execute)
+
+    # -----------------------------------
+    # SQL accounting
+    # -----------------------------------
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and '_metrics_start' in g:
+            g._metrics_sql_start = time.perf_counter()
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if has_request_context() and '_metrics_sql_start' in g:
+            g._metrics_sql_count += 1
+            g._metrics_sql_time += time.perf_counter() - g.pop('_metrics_sql_start')
+
+    # -----------------------------------
+    # Request hooks
+    # -----------------------------------
+    def start_request(self):
+        g._metrics_start = time.perf_counter()
+        g._metrics_sql_count = 0
+        g._metrics_sql_time = 0.0
+
+    def finish_request(self, response):
+        if '_metrics_start' not in g:
+            return response
+        elapsed = time.perf_counter() - g._metrics_start
+        sql_count, sql_time = g._metrics_sql_count, g._metrics_sql_time
+        endpoint = request.endpoint or 'unmatched'
+        labels = (('blueprint', request.blueprint or ''), ('endpoint', endpoint), ('method', request.method))
+        size = None if response.is_streamed else response.calculate_content_length()
+
+        with self.lock:
+            key = labels + (('status', response.status_code),)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.observe('http_request_duration_seconds', labels, elapsed)
+            self.observe('http_request_sql_statements', labels, sql_count)
+            self.observe('http_request_sql_duration_seconds', labels, sql_time)
+            if size is not None:
+                self.observe('http_response_size_bytes', labels, size)
+
+        if elapsed * 1000 > self.config['METRICS_SLOW_REQUEST_MS'] or sql_count > self.config['METRICS_SLOW_SQL_COUNT']:
+            self.logger.warning('Slow request %s %s -> %s: %.1f ms, %d SQL statements (%.1f ms)',
+                                request.method, request.path, endpoint, elapsed * 1000, sql_count, sql_time * 1000)
+
+        if self.config['METRICS_SERVER_TIMING']:
+            response.headers['Server-Timing'] = (
+                f'app;dur={elapsed * 1000:.1f}, db;dur={sql_time * 1000:.1f};desc="{sql_count} queries"'
+            )
+        return response
+
+    def observe(self, name, labels, value):
+        series = self.histograms[name]
+        if labels not in series:
+            series[labels] = Histogram(self.HISTOGRAMS[name][1])
+        series[labels].observe(value)
+
+    def inc(self, name, help_text, labels, value=1):
+        """Add to a counter owned by another subsystem (e.g. the rate limiter)."""
+        with self.lock:
+            series = self.counters.setdefault(name, (help_text, {}))[1]
+            series[labels] = series.get(labels, 0) + value
+
+    # -----------------------------------
+    # Exposition
+    # -----------------------------------
+    def render(self):
+        """The registry in Prometheus text exposition format."""
+        lines = ['# HELP http_requests_total Requests by endpoint and status.', '# TYPE http_requests_total counter']
+        with self.lock:
+            for labels, count in sorted(self.requests.items()):
+                lines.append(f'http_requests_total{{{format_labels(labels)}}} {count}')
+
+            for name, (help_text, _) in self.HISTOGRAMS.items():
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} histogram')
+                for labels, hist in sorted(self.histograms[name].items()):
+                    for bound, count in zip(hist.buckets, hist.counts):
+                        lines.append(f'{name}_bucket{{{format_labels(labels + (("le", bound),))}}} {count}')
+                    lines.append(f'{name}_bucket{{{format_labels(labels + (("le", "+Inf"),))}}} {hist.count}')
+                    lines.append(f'{name}_sum{{{format_labels(labels)}}} {hist.sum}')
+                    lines.append(f'{name}_count{{{format_labels(labels)}}} {hist.count}')
+
+            for name, (help_text, series) in sorted(self.counters.items()):
+                lines.append(f'# HELP {name} {help_text}')
+                lines.append(f'# TYPE {name} counter')
+                for labels, value in sorted(series.items()):
+                    lines.append(f'{name}{{{format_labels(labels)}}} {value}')
+        return '\n'.join(lines) + '\n'
+
+    def metrics_view(self):
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+
+metrics = Metrics()
@@ -15,8 +15,8 @@ class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     email = db.Column(db.String(150), unique=True, nullable=False)
     name = db.Column(db.String(150), nullable=True)
-    password = db.Column(db.String(150), nullable=False)
-    role = db.Column(db.Enum(UserRole), default=UserRole.USER, nullable=False)
+    password = db.Column(db.String(255), nullable=False)
+    role = db.Column(db.Enum(UserRole), default=UserRole.USER, nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     cart = db.relationship('Cart', backref='user', uselist=False, lazy=True)
@@ -34,10 +34,13 @@ class Product(db.Model):
     """Product model for storing grocery items."""
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(150), nullable=False)
-    price = db.Column(db.Float, nullable=False)
+    # Money columns hold integer cents; see backend/pricing.py
+    price_cents = db.Column(db.Integer, nullable=False, index=True)
     description = db.Column(db.Text, nullable=True)
-    stock = db.Column(db.Integer, default=0, nullable=False)
-    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False)
+    stock = db.Column(db.Integer, default=0, nullable=False, index=True)
+    # Units held by carts; available stock is stock - reserved
+    reserved = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), nullable=False, index=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     cart_items = db.relationship('CartItem', backref='product', lazy=True)
@@ -53,19 +56,32 @@ class Cart(db.Model):
 
 class CartItem(db.Model):
     """CartItem model to track items in a user's cart."""
+    # One row per product per cart, so add-to-cart can upsert in SQL
+    __table_args__ = (db.Index('ix_cart_item_cart_id_product_id', 'cart_id', 'product_id', unique=True),)
+
     id = db.Column(db.Integer, primary_key=True)
     cart_id = db.Column(db.Integer, db.ForeignKey('cart.id'), nullable=False)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
     added_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Set while the quantity is counted in Product.reserved; cleared by the sweeper
+    held_until = db.Column(db.DateTime, nullable=True, index=True)
 
 class Order(db.Model):
     """Order model to track user purchases."""
+    __table_args__ = (db.Index('ix_order_user_id_created_at', 'user_id', 'created_at'),)
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    total_amount = db.Column(db.Float, nullable=False)
+    subtotal_cents = db.Column(db.BigInteger, nullable=False)
+    discount_cents = db.Column(db.BigInteger, default=0, nullable=False)
+    tax_cents = db.Column(db.BigInteger, default=0, nullable=False)
+    total_cents = db.Column(db.BigInteger, nullable=False)
     status = db.Column(db.String(50), default="Pending", nullable=False)  
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Summary written once at checkout, so order history never reads order_item
+    item_count = db.Column(db.Integer, default=0, server_default='0', nullable=False)
+    lines = db.Column(db.JSON, nullable=True)  # [{product_id, name, quantity, price_cents}]
 
     order_items = db.relationship('OrderItem', backref='order', lazy=True)
     invoice = db.relationship('Invoice', backref='order', uselist=False, lazy=True)
@@ -73,10 +89,31 @@ class Order(db.Model):
 class OrderItem(db.Model):
     """OrderItem model to track items in an order."""
     id = db.Column(db.Integer, primary_key=True)
-    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False)
+    order_id = db.Column(db.Integer, db.ForeignKey('order.id'), nullable=False, index=True)
     product_id = db.Column(db.Integer, db.ForeignKey('product.id'), nullable=False)
     quantity = db.Column(db.Integer, nullable=False)
-    price = db.Column(db.Float, nullable=False)
+    price_cents = db.Column(db.Integer, nullable=False)
+
+class ArchivedOrder(db.Model):
+    """Summary of an order moved out of the hot order tables by the archiver.
+
+    Keeps the same id as the original order. There are no foreign keys, so
+    the table can also live in a separate SQLite file (ORDER_ARCHIVE_PATH).
+    """
+    __table_args__ = (db.Index('ix_archived_order_user_id_id', 'user_id', 'id'),)
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    user_id = db.Column(db.Integer, nullable=False)
+    subtotal_cents = db.Column(db.BigInteger, nullable=False)
+    discount_cents = db.Column(db.BigInteger, nullable=False)
+    tax_cents = db.Column(db.BigInteger, nullable=False)
+    total_cents = db.Column(db.BigInteger, nullable=False)
+    status = db.Column(db.String(50), nullable=False)
+    created_at = db.Column(db.DateTime, nullable=True)
+    item_count = db.Column(db.Integer, nullable=False)
+    lines = db.Column(db.JSON, nullable=True)
+    invoice_number = db.Column(db.String(100), nullable=True)
+    archived_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
 
 class Invoice(db.Model):
     """Invoice model to track order invoices."""
@@ -84,4 +121,40 @@ class Invoice(db.Model):
     order_id = db.Column(db.Integer, db.ForeignKey('order.id'), unique=True, nullable=False)
     invoice_number = db.Column(db.String(100), unique=True, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
-    status = db.Column(db.String(50), default="Pending", nullable=False)  # Pending, Paid, Failed
+    status = db.Column(db.String(50), default="Pending", nullable=False)  # Pending, Issued, Paid, Failed
+
+class Job(db.Model):
+    """Background job queued in the database and run by worker processes."""
+    __table_args__ = (db.Index('ix_job_status_run_at', 'status', 'run_at'),)
+
+    id = db.Column(db.Integer, primary_key=True)
+    kind = db.Column(db.String(100), nullable=False)
+    payload = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(db.String(20), default="queued", nullable=False)  # queued, running, done, failed
+    attempts = db.Column(db.Integer, default=0, nullable=False)
+    max_attempts = db.Column(db.Integer, default=5, nullable=False)
+    run_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
+    locked_by = db.Column(db.String(100), nullable=True)
+    locked_at = db.Column(db.DateTime, nullable=True)
+    last_error = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+class DailySales(db.Model):
+    """Revenue rollup per day and category, maintained from placed orders."""
+    day = db.Column(db.Date, primary_key=True)
+    category_id = db.Column(db.Integer, db.ForeignKey('category.id'), primary_key=True)
+    units = db.Column(db.Integer, default=0, nullable=False)
+    revenue_cents = db.Column(db.BigInteger, default=0, nullable=False)
+
+class ProductSales(db.Model):
+    """All-time sales rollup per product, maintained from placed orders."""
+    product_id = db.Column(db.Integer, db.ForeignKey('product.id'), primary_key=True)
+    units = db.Column(db.Integer, default=0, nullable=False, index=True)
+    revenue_cents = db.Column(db.BigInteger, default=0, nullable=False)
+    last_sold_at = db.Column(db.DateTime, nullable=True)
+
+class SchemaVersion(db.Model):
+    """Fingerprint of the schema "flask init-db" last ensured; a single row with id 1."""
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
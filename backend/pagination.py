@@ -0,0 +1,26 @@
+from flask import jsonify
+from .serialization import stream_json_array
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def page_limit(args, default=DEFAULT_PAGE_SIZE):
+    """Read ?limit= from the query string, clamped to MAX_PAGE_SIZE."""
+    return min(max(args.get('limit', default, type=int), 1), MAX_PAGE_SIZE)
+
+
+def split_page(rows, limit):
+    """Trim a limit+1 fetch to one page and report whether more rows exist."""
+    return rows[:limit], len(rows) > limit
+
+
+def list_response(items, next_cursor=None):
+    """JSON list response with the next keyset cursor in X-Next-Cursor.
+
+    A list is encoded in one go; any other iterable is streamed.
+    """
+    response = jsonify(items) if isinstance(items, list) else stream_json_array(items)
+    if next_cursor is not None:
+        response.headers['X-Next-Cursor'] = str(next_cursor)
+    return response
@@ -0,0 +1,119 @@
+from werkzeug.security import generate_password_hash, check_password_hash
+from concurrent.futures import ThreadPoolExecutor
+import hashlib
+import hmac
+import os
+import threading
+
+
+# Digests werkzeug < 2.3 wrote as "method$salt$hexdigest" (HMAC keyed by the salt)
+LEGACY_METHODS = ('md5', 'sha1', 'sha224', 'sha256', 'sha384', 'sha512')
+
+
+class HasherBusy(Exception):
+    """Raised when the hashing pool is saturated; callers answer 503."""
+
+
+def check_hash(stored, password):
+    """check_password_hash that also verifies legacy digests; unknown formats never match."""
+    method = stored.split('$', 1)[0]
+    if method in LEGACY_METHODS:
+        try:
+            _, salt, expected = stored.split('$', 2)
+        except ValueError:
+            return False
+        if salt:
+            actual = hmac.new(salt.encode(), password.encode(), method).hexdigest()
+        else:
+            actual = hashlib.new(method, password.encode()).hexdigest()
+        return hmac.compare_digest(actual, expected)
+    try:
+        return check_password_hash(stored, password)
+    except ValueError:
+        return False
+
+
+class PasswordHasher:
+    """Hashes and verifies passwords on a bounded worker pool.
+
+    The method is any werkzeug hash method string, e.g. "scrypt:32768:8:1"
+    or "pbkdf2:sha256:600000". scrypt and pbkdf2 release the GIL, so worker
+    threads run in parallel while the semaphore caps how much login work can
+    be in flight at once; beyond that, requests fail fast instead of queuing
+    behind the CPU.
+    """
+
+    def __init__(self, app=None):
+        self.method = None
+        self._dummy_hash = None
+        self.executor = None
+        self.slots = None
+        self.timeout = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('PASSWORD_HASH_METHOD', 'scrypt:32768:8:1')
+        app.config.setdefault('PASSWORD_HASH_WORKERS', os.cpu_count() or 2)
+        app.config.setdefault('PASSWORD_HASH_QUEUE', 32)
+        app.config.setdefault('PASSWORD_HASH_TIMEOUT', 5)
+        self.configure(
+            app.config['PASSWORD_HASH_METHOD'],
+            app.config['PASSWORD_HASH_WORKERS'],
+            app.config['PASSWORD_HASH_QUEUE'],
+            app.config['PASSWORD_HASH_TIMEOUT'],
+        )
+
+    def configure(self, method, workers, queue, timeout):
+        if method.split(':', 1)[0] not in ('scrypt', 'pbkdf2'):
+            raise ValueError(f'Invalid hash method {method!r}')
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        self.method = method
+        self._dummy_hash = None
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hash')
+        self.slots = threading.BoundedSemaphore(workers + queue)
+        self.timeout = timeout
+
+    @property
+    def dummy_hash(self):
+        """Hash of '' under the policy; computed on first use, as it costs a full hash."""
+        if self._dummy_hash is None:
+            self._dummy_hash = generate_password_hash('', method=self.method)
+        return self._dummy_hash
+
+    @property
+    def prefix(self):
+        """Canonical "method:params" prefix, e.g. "scrypt" -> "scrypt:32768:8:1"."""
+        return self.dummy_hash.split('$', 1)[0]
+
+    def run(self, fn, *args):
+        """Run fn on the pool, waiting at most timeout for a free slot."""
+        if not self.slots.acquire(timeout=self.timeout):
+            raise HasherBusy()
+        try:
+            return self.executor.submit(fn, *args).result()
+        finally:
+            self.slots.release()
+
+    def hash(self, password):
+        """Hash a password with the configured policy."""
+        return self.run(generate_password_hash, password, self.method)
+
+    def needs_rehash(self, stored):
+        """True for plaintext, legacy or weaker hashes than the current policy."""
+        return stored.split('$', 1)[0] != self.prefix
+
+    def verify(self, stored, password):
+        """Check a password; stored may be None to burn equal time for unknown users."""
+        if stored is None:
+            self.run(check_password_hash, self.dummy_hash, password or '')
+            return False
+        if '$' not in stored:
+            # Legacy plaintext rows (the seeded admin) are upgraded on login
+            return hmac.compare_digest(stored.encode(), (password or '').encode())
+        return self.run(check_hash, stored, password or '')
+
+
+password_hasher = PasswordHasher()
+
@@ -0,0 +1,77 @@
+from flask import current_app
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+# All money is stored and summed as integer cents; the API speaks major units.
+Totals = namedtuple('Totals', 'subtotal discount tax total')
+
+# Largest amount Product.price_cents (a 32-bit Integer column) can hold
+MAX_CENTS = 2**31 - 1
+
+
+def to_cents(value):
+    """Parse an amount in major units (number or numeric string) into cents, rounding half up."""
+    if value is None or isinstance(value, bool):
+        raise ValueError('An amount is required')
+    try:
+        amount = Decimal(str(value))
+    except InvalidOperation:
+        raise ValueError(f'Invalid amount: {value!r}')
+    if not amount.is_finite():
+        raise ValueError(f'Invalid amount: {value!r}')
+    if amount < 0:
+        raise ValueError('Amounts must not be negative')
+    try:
+        cents = int((amount * 100).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except ArithmeticError:  # InvalidOperation once the digits exceed the context precision
+        raise ValueError(f'Amount is too large: {value!r}')
+    if cents > MAX_CENTS:
+        raise ValueError(f'Amount is too large: {value!r}')
+    return cents
+
+
+def from_cents(cents):
+    """Cents as a JSON number in major units; prints exactly to the cent."""
+    return None if cents is None else cents / 100
+
+
+def format_cents(cents):
+    """Cents as a fixed two-decimal string, e.g. 1999 -> '19.99'."""
+    sign = '-' if cents < 0 else ''
+    return f'{sign}{abs(cents) // 100}.{abs(cents) % 100:02d}'
+
+
+def apply_bps(amount, bps):
+    """amount * bps / 10000 rounded half up, in integer arithmetic."""
+    return (amount * bps + 5000) // 10000
+
+
+def discount_tiers(spec):
+    """'min_subtotal_cents:bps,...' -> [(min_subtotal_cents, bps)] sorted by threshold."""
+    tiers = []
+    for part in (spec or '').split(','):
+        if part.strip():
+            threshold, _, bps = part.partition(':')
+            tiers.append((int(threshold), int(bps)))
+    return sorted(tiers)
+
+
+def price_totals(subtotal):
+    """Apply the cart-level discount tier and tax to a subtotal, all in cents.
+
+    The subtotal comes from one SQL aggregate over the whole cart or order,
+    so rules apply once per basket instead of once per line.
+    """
+    config = current_app.config
+    rate = 0
+    for threshold, bps in discount_tiers(config['PRICING_DISCOUNT_TIERS']):
+        if subtotal >= threshold:
+            rate = bps
+    discount = apply_bps(subtotal, rate)
+    tax = apply_bps(subtotal - discount, config['PRICING_TAX_BPS'])
+    return Totals(subtotal, discount, tax, subtotal - discount + tax)
+
+
+def totals_json(totals):
+    """Totals in major units for API responses."""
+    return {field: from_cents(cents) for field, cents in totals._asdict().items()}
@@ -0,0 +1,194 @@
+from flask import current_app, jsonify, make_response, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from collections import OrderedDict
+from functools import wraps
+from .metrics import metrics
+import math
+import threading
+import time
+
+# Atomic token bucket: refill from the server clock, then try to take cost tokens.
+# Floats go back as strings because Lua numbers are truncated to integers on return.
+TOKEN_BUCKET_LUA = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or burst
+local ts = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+local allowed, retry = 0, 0
+if tokens >= cost then
+  tokens = tokens - cost
+  allowed = 1
+else
+  retry = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / rate * 1000))
+return {allowed, tostring(tokens), tostring(retry)}
+"""
+
+
+class MemoryBucketStore:
+    """Token buckets in process memory, least recently used evicted first.
+
+    Each worker process keeps its own buckets, so with N workers a client
+    can get up to N times the configured rate; use Redis to share them.
+    """
+
+    def __init__(self, max_keys=100000):
+        self.max_keys = max_keys
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, rate, burst, cost=1):
+        """Try to take cost tokens; returns (allowed, tokens left, seconds until allowed)."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, ts = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - ts) * rate)
+            allowed = tokens >= cost
+            if allowed:
+                tokens -= cost
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        return allowed, tokens, 0.0 if allowed else (cost - tokens) / rate
+
+
+class RedisBucketStore:
+    """Token buckets shared by every worker through a server speaking the Redis protocol.
+
+    Works with any client exposing redis-py's register_script (redis-py,
+    valkey, fakeredis); the script runs atomically on the server.
+    """
+
+    def __init__(self, client, prefix='raasan:ratelimit:'):
+        self.prefix = prefix
+        self.script = client.register_script(TOKEN_BUCKET_LUA)
+
+    def take(self, key, rate, burst, cost=1):
+        allowed, tokens, retry = self.script(keys=[self.prefix + key], args=[rate, burst, cost])
+        return bool(int(allowed)), float(tokens), float(retry)
+
+
+# Groups keyed by client IP even for signed-in clients: the login and signup routes
+# must not hand out a fresh burst for every account an attacker holds
+IP_KEYED_GROUPS = ('auth',)
+
+
+def parse_limit(spec):
+    """'count/seconds[:burst]' -> (tokens per second, burst). Burst defaults to count."""
+    rate_part, _, burst = spec.partition(':')
+    count, _, seconds = rate_part.partition('/')
+    count, seconds = float(count), float(seconds or 1)
+    if count <= 0 or seconds <= 0:
+        raise ValueError(f'Invalid rate limit: {spec}')
+    return count / seconds, float(burst) if burst else count
+
+
+class RateLimiter:
+    """Token-bucket rate limits per route group.
+
+    Views opt in with @rate_limiter.limit('group'). Requests are keyed by
+    the JWT identity when a valid token is present and by client IP
+    otherwise; groups in IP_KEYED_GROUPS always use the client IP. Over-limit requests get 429 with Retry-After; every decision
+    is counted in /metrics. If the store is unreachable requests are let
+    through rather than failing the site.
+    """
+
+    def __init__(self, app=None):
+        self.store = None
+        self.limits = {}
+        self.proxy_hops = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.config.setdefault('RATELIMIT_BACKEND', 'memory')  # memory, redis or none
+        app.config.setdefault('RATELIMIT_LIMITS', {})
+        app.config.setdefault('RATELIMIT_REDIS_URL', 'redis://localhost:6379/0')
+        app.config.setdefault('RATELIMIT_REDIS_CLIENT', None)
+        app.config.setdefault('RATELIMIT_PROXY_HOPS', 0)
+
+        kind = app.config['RATELIMIT_BACKEND']
+        if kind == 'memory':
+            self.store = MemoryBucketStore()
+        elif kind == 'redis':
+            client = app.config['RATELIMIT_REDIS_CLIENT']
+            if client is None:
+                try:
+                    import redis
+                except ImportError:
+                    raise RuntimeError("RATELIMIT_BACKEND='redis' requires the redis package")
+                client = redis.Redis.from_url(app.config['RATELIMIT_REDIS_URL'])
+            self.store = RedisBucketStore(client)
+        elif kind == 'none':
+            self.store = None
+        else:
+            raise ValueError(f"Unknown RATELIMIT_BACKEND: {kind}")
+
+        self.limits = {group: parse_limit(spec) for group, spec in app.config['RATELIMIT_LIMITS'].items() if spec}
+        self.proxy_hops = app.config['RATELIMIT_PROXY_HOPS']
+
+    def client_ip(self):
+        """The client address, trusting X-Forwarded-For only for RATELIMIT_PROXY_HOPS proxies."""
+        route = request.access_route
+        if self.proxy_hops and len(route) >= self.proxy_hops:
+            return route[-self.proxy_hops]
+        return request.remote_addr or 'unknown'
+
+    def client_key(self, group):
+        if group in IP_KEYED_GROUPS:
+            return f'ip:{self.client_ip()}'
+        try:
+            verify_jwt_in_request(optional=True)
+            identity = get_jwt_identity()
+        except Exception:
+            identity = None  # a bad token is rejected by the view itself
+        return f'user:{identity}' if identity else f'ip:{self.client_ip()}'
+
+    def hit(self, group):
+        """Take one token for the current client; returns (allowed, remaining, retry_after)."""
+        rate, burst = self.limits[group]
+        try:
+            allowed, tokens, retry = self.store.take(f'{group}:{self.client_key(group)}', rate, burst)
+        except Exception:
+            current_app.logger.exception('Rate limit store unavailable; allowing request')
+            metrics.inc('rate_limit_decisions_total', 'Rate limit decisions by route group.',
+                        (('group', group), ('result', 'error')))
+            return True, burst, 0.0
+
+        metrics.inc('rate_limit_decisions_total', 'Rate limit decisions by route group.',
+                    (('group', group), ('result', 'allowed' if allowed else 'limited')))
+        return allowed, tokens, retry
+
+    def limit(self, group):
+        """Decorator applying the group's limit from RATELIMIT_LIMITS."""
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.store is None or group not in self.limits:
+                    return view(*args, **kwargs)
+
+                allowed, tokens, retry = self.hit(group)
+                burst = int(self.limits[group][1])
+                if not allowed:
+                    retry_after = max(1, math.ceil(retry))
+                    response = jsonify({'error': 'Too many requests, please retry later', 'retry_after': retry_after})
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(retry_after)
+                else:
+                    response = make_response(view(*args, **kwargs))
+                response.headers['RateLimit-Limit'] = str(burst)
+                response.headers['RateLimit-Remaining'] = str(int(tokens))
+                return response
+            return wrapper
+        return decorator
+
+
+rate_limiter = RateLimiter()
@@ -0,0 +1,153 @@
+from sqlalchemy import text
+from .models import db
+from .database import read_bind
+from .pricing import from_cents
+import re
+
+# Relative weight of a match in the product name, description and category name
+NAME_WEIGHT, DESCRIPTION_WEIGHT, CATEGORY_WEIGHT = 10.0, 2.0, 5.0
+MAX_TERMS = 8
+
+# -----------------------------------
+# INDEX DDL
+# -----------------------------------
+# SQLite keeps a regular FTS5 table keyed by product id; triggers mirror every
+# product write and category rename into it, including bulk Core statements.
+SQLITE_DDL = [
+    """CREATE VIRTUAL TABLE product_fts USING fts5(
+        name, description, category,
+        tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')""",
+    """CREATE TRIGGER product_fts_insert AFTER INSERT ON product BEGIN
+        INSERT INTO product_fts (rowid, name, description, category)
+        VALUES (new.id, new.name, coalesce(new.description, ''),
+                coalesce((SELECT name FROM category WHERE id = new.category_id), ''));
+    END""",
+    """CREATE TRIGGER product_fts_update AFTER UPDATE OF name, description, category_id ON product BEGIN
+        DELETE FROM product_fts WHERE rowid = old.id;
+        INSERT INTO product_fts (rowid, name, description, category)
+        VALUES (new.id, new.name, coalesce(new.description, ''),
+                coalesce((SELECT name FROM category WHERE id = new.category_id), ''));
+    END""",
+    """CREATE TRIGGER product_fts_delete AFTER DELETE ON product BEGIN
+        DELETE FROM product_fts WHERE rowid = old.id;
+    END""",
+    """CREATE TRIGGER product_fts_category AFTER UPDATE OF name ON category BEGIN
+        UPDATE product_fts SET category = new.name
+        WHERE rowid IN (SELECT id FROM product WHERE category_id = new.id);
+    END""",
+    """INSERT INTO product_fts (rowid, name, description, category)
+        SELECT p.id, p.name, coalesce(p.description, ''), coalesce(c.name, '')
+        FROM product p LEFT JOIN category c ON c.id = p.category_id""",
+]
+
+# Postgres keeps one weighted tsvector per product behind a GIN index
+POSTGRES_DOCUMENT = """
+    setweight(to_tsvector('simple', coalesce(p.name, '')), 'A') ||
+    setweight(to_tsvector('simple', coalesce(c.name, '')), 'B') ||
+    setweight(to_tsvector('simple', coalesce(p.description, '')), 'C')"""
+
+POSTGRES_DDL = [
+    """CREATE TABLE product_search (
+        product_id INTEGER PRIMARY KEY REFERENCES product (id) ON DELETE CASCADE,
+        document tsvector NOT NULL)""",
+    "CREATE INDEX ix_product_search_document ON product_search USING GIN (document)",
+    f"""CREATE OR REPLACE FUNCTION product_search_refresh() RETURNS trigger AS $$
+    BEGIN
+        INSERT INTO product_search (product_id, document)
+        SELECT p.id, {POSTGRES_DOCUMENT}
+        FROM product p LEFT JOIN category c ON c.id = p.category_id
+        WHERE (TG_TABLE_NAME = 'product' AND p.id = NEW.id)
+           OR (TG_TABLE_NAME = 'category' AND p.category_id = NEW.id)
+        ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document;
+        RETURN NULL;
+    END $$ LANGUAGE plpgsql""",
+    """CREATE TRIGGER product_search_product AFTER INSERT OR UPDATE OF name, description, category_id
+        ON product FOR EACH ROW EXECUTE FUNCTION product_search_refresh()""",
+    """CREATE TRIGGER product_search_category AFTER UPDATE OF name
+        ON category FOR EACH ROW EXECUTE FUNCTION product_search_refresh()""",
+    f"""INSERT INTO product_search (product_id, document)
+        SELECT p.id, {POSTGRES_DOCUMENT}
+        FROM product p LEFT JOIN category c ON c.id = p.category_id""",
+]
+
+INDEX_TABLES = {'sqlite': 'product_fts', 'postgresql': 'product_search'}
+INDEX_DDL = {'sqlite': SQLITE_DDL, 'postgresql': POSTGRES_DDL}
+
+
+def include_in_migrations(obj, name, type_, reflected, compare_to):
+    """Alembic include_object hook hiding the search index from autogenerate."""
+    return not (type_ == 'table' and reflected and name.startswith(tuple(INDEX_TABLES.values())))
+
+
+def ensure_search_index():
+    """Create and backfill the search index if this database lacks it."""
+    dialect = db.engine.dialect.name
+    table = INDEX_TABLES.get(dialect)
+    if table is None or db.inspect(db.engine).has_table(table):
+        return
+
+    with db.engine.begin() as connection:
+        for statement in INDEX_DDL[dialect]:
+            connection.exec_driver_sql(statement)
+
+
+# -----------------------------------
+# QUERIES
+# -----------------------------------
+def search_terms(q):
+    """Split a user query into safe word tokens."""
+    return re.findall(r'\w+', q.lower())[:MAX_TERMS]
+
+
+def match_expression(terms, dialect):
+    """Prefix-match every term (AND semantics) in the dialect's query syntax."""
+    if dialect == 'postgresql':
+        return ' & '.join(f'{t}:*' for t in terms)
+    return ' '.join(f'"{t}"*' for t in terms)
+
+
+def search_products(q, category_id=None, limit=20, offset=0):
+    """Ranked product matches for q plus per-category facet counts.
+
+    Returns None when q has no searchable terms.
+    """
+    terms = search_terms(q)
+    if not terms:
+        return None
+
+    dialect = db.engine.dialect.name
+    params = {'q': match_expression(terms, dialect), 'category_id': category_id, 'limit': limit, 'offset': offset}
+
+    if dialect == 'postgresql':
+        source = "FROM product_search s JOIN product p ON p.id = s.product_id"
+        match = "s.document @@ to_tsquery('simple', :q)"
+        rank = "ts_rank(s.document, to_tsquery('simple', :q)) DESC"
+    else:
+        source = "FROM product_fts JOIN product p ON p.id = product_fts.rowid"
+        match = "product_fts MATCH :q"
+        rank = f"bm25(product_fts, {NAME_WEIGHT}, {DESCRIPTION_WEIGHT}, {CATEGORY_WEIGHT})"
+
+    category_filter = " AND p.category_id = :category_id" if category_id is not None else ""
+    bind = read_bind()
+
+    rows = db.session.execute(text(
+        f"SELECT p.id, p.name, p.price_cents AS price, p.description, p.stock, p.category_id"
+        f" {source} WHERE {match}{category_filter}"
+        f" ORDER BY {rank}, p.id LIMIT :limit OFFSET :offset"
+    ), params, bind_arguments=bind).mappings().all()
+
+    # Facets always cover every match, so clients can widen a category filter
+    facets = db.session.execute(text(
+        f"SELECT p.category_id, c.name, count(*) AS count"
+        f" {source} LEFT JOIN category c ON c.id = p.category_id WHERE {match}"
+        f" GROUP BY p.category_id, c.name ORDER BY count DESC"
+    ), params, bind_arguments=bind).mappings().all()
+
+    facets = [dict(f) for f in facets]
+    if category_id is not None:
+        total = sum(f['count'] for f in facets if f['category_id'] == category_id)
+    else:
+        total = sum(f['count'] for f in facets)
+
+    items = [{**r, 'price': from_cents(r['price'])} for r in rows]
+    return {'query': q, 'total': total, 'items': items, 'facets': facets}
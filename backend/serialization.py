@@ -0,0 +1,78 @@
+from flask import current_app, stream_with_context
+from flask.json.provider import DefaultJSONProvider, _default
+
+try:
+    import orjson
+except ImportError:  # optional; the stdlib provider is used instead
+    orjson = None
+
+# Items encoded per chunk when streaming a JSON array
+STREAM_CHUNK_ITEMS = 500
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by orjson.
+
+    Output matches the default provider's conventions: sorted keys, compact
+    unless debugging, dates as HTTP dates and the same fallbacks for
+    Decimal, UUID and dataclasses. Keyword arguments meant for the stdlib
+    encoder are accepted and ignored.
+    """
+
+    def options(self, indent=False):
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps_bytes(self, obj, indent=False):
+        return orjson.dumps(obj, default=_default, option=self.options(indent))
+
+    def dumps(self, obj, **kwargs):
+        return self.dumps_bytes(obj, indent=bool(kwargs.get('indent'))).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(self.dumps_bytes(obj, indent) + b'\n', mimetype=self.mimetype)
+
+
+def init_json(app):
+    """Install the configured JSON provider: orjson, stdlib, or auto (orjson if installed)."""
+    app.config.setdefault('JSON_PROVIDER', 'auto')
+    kind = app.config['JSON_PROVIDER']
+    if kind not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError(f"Unknown JSON_PROVIDER: {kind}")
+    if kind == 'orjson' and orjson is None:
+        raise RuntimeError("JSON_PROVIDER='orjson' requires the orjson package")
+    if kind != 'stdlib' and orjson is not None:
+        app.json = OrjsonProvider(app)
+
+
+def iter_json_array(items, dumps, chunk_size=STREAM_CHUNK_ITEMS):
+    """Encode an iterable as a JSON array, yielding a chunk per chunk_size items."""
+    yield '['
+    chunk, separator = [], ''
+    for item in items:
+        chunk.append(dumps(item))
+        if len(chunk) == chunk_size:
+            yield separator + ','.join(chunk)
+            chunk, separator = [], ','
+    if chunk:
+        yield separator + ','.join(chunk)
+    yield ']\n'
+
+
+def stream_json_array(items):
+    """Streamed application/json response for an iterable of JSON-able items.
+
+    Items are encoded as they are produced, so a generator backed by a
+    server-side cursor is never held in memory as a whole.
+    """
+    body = iter_json_array(items, current_app.json.dumps)
+    return current_app.response_class(stream_with_context(body), mimetype='application/json')
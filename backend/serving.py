@@ -0,0 +1,84 @@
+from flask import Blueprint, jsonify
+from sqlalchemy import text
+from .models import User, db
+from .passwords import password_hasher
+import signal
+import threading
+
+health = Blueprint('health', __name__)
+
+# Set once the process has been asked to stop; readiness fails from then on
+draining = threading.Event()
+_schema_seen = False
+
+
+# -----------------------------------
+# PROBES
+# -----------------------------------
+@health.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and serving. Never touches the database."""
+    return jsonify({'status': 'ok'})
+
+@health.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: not draining, the database answers and the schema exists."""
+    global _schema_seen
+    if draining.is_set():
+        return jsonify({'status': 'draining'}), 503
+
+    try:
+        db.session.execute(text('SELECT 1'))
+        if not _schema_seen:
+            # A catalog lookup, not a table scan; only needed until it succeeds once
+            _schema_seen = db.inspect(db.engine).has_table(User.__tablename__)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'status': 'unavailable', 'error': e.__class__.__name__}), 503
+
+    if not _schema_seen:
+        return jsonify({'status': 'uninitialized', 'error': 'Run "flask init-db" first'}), 503
+    return jsonify({'status': 'ready'})
+
+
+# -----------------------------------
+# WORKER LIFECYCLE
+# -----------------------------------
+def install_drain_handler(drain_seconds, on_stop):
+    """Turn SIGTERM into: fail readiness, keep serving for drain_seconds, then stop.
+
+    The delay gives load balancers time to notice the failing probe before
+    the server stops accepting connections; on_stop is the server's own
+    graceful shutdown (e.g. the gunicorn worker's SIGTERM handler), which
+    finishes in-flight requests.
+    """
+    def handle(signum, frame):
+        if draining.is_set():
+            return
+        draining.set()
+        timer = threading.Timer(drain_seconds, on_stop, args=(signum, frame))
+        timer.daemon = True
+        timer.start()
+
+    signal.signal(signal.SIGTERM, handle)
+
+
+def after_fork(app):
+    """Drop state inherited from a preloading parent process.
+
+    Pooled connections and the password hashing threads must not be shared
+    across a fork, so each worker starts with fresh ones.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    password_hasher.init_app(app)
+
+
+def shutdown(app):
+    """Release pooled connections and hashing threads when a worker exits."""
+    if password_hasher.executor is not None:
+        password_hasher.executor.shutdown(wait=True)
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
@@ -1,92 +1,75 @@
 from flask import Blueprint, request, jsonify
-from flask_jwt_extended import jwt_required, get_jwt_identity
-from .models import User, Cart, CartItem, Product, Order, OrderItem, Invoice, Category
-from . import db
-import uuid
+from flask_jwt_extended import jwt_required
+from .models import Product
+from .identity import current_user_id, admin_required
+from .catalog import product_list_response
+from .cache import response_cache
+from .events import event_hub, product_delta
+from .ratelimit import rate_limiter
+from .pagination import page_limit, list_response
+from .pricing import to_cents
+from . import db, archive, cart, checkout
+from datetime import datetime
 
 main = Blueprint('main', __name__)
 
-# -----------------------------------
-# ROLE CHECK FUNCTION
-# -----------------------------------
-def is_admin(user_id):
-    """Check if the user is an admin."""
-    user = User.query.get(user_id)
-    return user and user.role == "admin"
-
 # -----------------------------------
 # CART MANAGEMENT
 # -----------------------------------
 @main.route('/cart', methods=['GET'])
 @jwt_required()
 def get_cart():
-    """Retrieve the user's cart."""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-
-    if not user.cart:
-        return jsonify({'message': 'Cart is empty', 'items': []})
+    """Retrieve the user's cart with product details and totals."""
+    contents = cart.cart_contents(current_user_id())
 
-    cart_items = CartItem.query.filter_by(cart_id=user.cart.id).all()
-    items = [{"id": item.id, "product_id": item.product_id, "quantity": item.quantity} for item in cart_items]
+    if not contents or not contents['items']:
+        return jsonify({'message': 'Cart is empty', 'items': [], 'total': 0})
 
-    return jsonify({'cart_id': user.cart.id, 'items': items})
+    return jsonify(contents)
 
 @main.route('/cart/add', methods=['POST'])
 @jwt_required()
+@rate_limiter.limit('cart')
 def add_to_cart():
     """Add a product to the user's cart."""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-
     data = request.get_json()
     product_id = data.get('product_id')
     quantity = data.get('quantity', 1)
 
-    product = Product.query.get(product_id)
-    if not product:
-        return jsonify({'error': 'Product not found'}), 404
+    try:
+        cart.add_to_cart(current_user_id(), product_id, quantity)
+    except cart.CartError as e:
+        return jsonify({'error': e.message}), e.status
+
+    return jsonify({'message': 'Product added to cart'})
 
-    if product.stock < quantity:
-        return jsonify({'error': 'Not enough stock available'}), 400
+@main.route('/cart', methods=['PATCH'])
+@jwt_required()
+@rate_limiter.limit('cart')
+def update_cart():
+    """Apply a batch of cart operations in one transaction.
 
-    if not user.cart:
-        user.cart = Cart(user_id=user.id)
-        db.session.add(user.cart)
-        db.session.commit()
+    Body: {"operations": [{"op": "add"|"set"|"remove", "product_id": 1, "quantity": 2}, ...]}
+    """
+    data = request.get_json()
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'A non-empty operations list is required'}), 400
 
-    cart_item = CartItem.query.filter_by(cart_id=user.cart.id, product_id=product.id).first()
-    if cart_item:
-        cart_item.quantity += quantity
-    else:
-        cart_item = CartItem(cart_id=user.cart.id, product_id=product.id, quantity=quantity)
-        db.session.add(cart_item)
+    try:
+        cart_id = cart.apply_operations(current_user_id(), operations)
+    except cart.CartError as e:
+        return jsonify({'error': e.message}), e.status
 
-    db.session.commit()
-    return jsonify({'message': 'Product added to cart'})
+    return jsonify({'message': 'Cart updated', 'cart_id': cart_id})
 
 @main.route('/cart/remove/<int:item_id>', methods=['DELETE'])
 @jwt_required()
 def remove_from_cart(item_id):
     """Remove a product from the user's cart."""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or not user.cart:
-        return jsonify({'error': 'Cart not found'}), 404
-
-    cart_item = CartItem.query.get(item_id)
-    if not cart_item or cart_item.cart_id != user.cart.id:
+    if not cart.remove_item(current_user_id(), item_id):
         return jsonify({'error': 'Item not found in cart'}), 404
 
-    db.session.delete(cart_item)
-    db.session.commit()
     return jsonify({'message': 'Item removed from cart'})
 
 # -----------------------------------
@@ -94,81 +77,61 @@ def remove_from_cart(item_id):
 # -----------------------------------
 @main.route('/order/place', methods=['POST'])
 @jwt_required()
+@rate_limiter.limit('checkout')
 def place_order():
     """Convert the cart into an order."""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user or not user.cart:
-        return jsonify({'error': 'Cart is empty'}), 400
-
-    cart_items = CartItem.query.filter_by(cart_id=user.cart.id).all()
-    if not cart_items:
-        return jsonify({'error': 'Cart is empty'}), 400
-
-    total_amount = sum(item.quantity * item.product.price for item in cart_items)
-
-    new_order = Order(user_id=user.id, total_amount=total_amount, status="Pending")
-    db.session.add(new_order)
-    db.session.commit()
-
-    for item in cart_items:
-        order_item = OrderItem(order_id=new_order.id, product_id=item.product_id, quantity=item.quantity, price=item.product.price)
-        db.session.add(order_item)
-        item.product.stock -= item.quantity
+    user_id = current_user_id()
 
-    invoice_number = str(uuid.uuid4())[:8]
-    invoice = Invoice(order_id=new_order.id, invoice_number=invoice_number, status="Pending")
-    db.session.add(invoice)
+    try:
+        order = checkout.place_order(user_id)
+    except checkout.CheckoutError as e:
+        return jsonify({'error': e.message}), e.status
 
-    CartItem.query.filter_by(cart_id=user.cart.id).delete()
-    db.session.commit()
+    return jsonify({'message': 'Order placed successfully', 'order_id': order.id, 'status': order.status}), 201
 
-    return jsonify({'message': 'Order placed successfully', 'order_id': new_order.id, 'invoice_number': invoice_number})
+def parse_date(value):
+    """Parse an optional ISO date/datetime query parameter."""
+    return datetime.fromisoformat(value) if value else None
 
 @main.route('/order/history', methods=['GET'])
 @jwt_required()
 def order_history():
-    """Retrieve the order history for a user."""
-    user_id = get_jwt_identity()
-    user = User.query.get(user_id)
-
-    if not user:
-        return jsonify({'error': 'User not found'}), 404
-
-    orders = Order.query.filter_by(user_id=user.id).all()
-    order_list = []
-    for order in orders:
-        items = OrderItem.query.filter_by(order_id=order.id).all()
-        item_list = [{"product_id": item.product_id, "quantity": item.quantity, "price": item.price} for item in items]
-        order_list.append({
-            "order_id": order.id,
-            "total_amount": order.total_amount,
-            "status": order.status,
-            "items": item_list
-        })
-
-    return jsonify(order_list)
+    """Retrieve a page of the user's orders, newest first.
+
+    Supports ?from= / ?to= (ISO dates on created_at) and keyset pagination
+    through ?cursor= (last order id of the previous page) and ?limit=.
+    Orders come from their checkout summaries, hot ones first, then those
+    moved to the archive.
+    """
+    user_id = current_user_id()
+
+    try:
+        date_from = parse_date(request.args.get('from'))
+        date_to = parse_date(request.args.get('to'))
+    except ValueError:
+        return jsonify({'error': 'Dates must be in ISO format'}), 400
+
+    order_list, next_cursor = archive.history_page(
+        user_id, date_from, date_to,
+        cursor=request.args.get('cursor', type=int),
+        limit=page_limit(request.args, default=20),
+    )
+    return list_response(order_list, next_cursor)
 
 # -----------------------------------
 # ADMIN MANAGEMENT (PRODUCTS & CATEGORIES)
 # -----------------------------------
 @main.route('/admin/products', methods=['GET'])
 @jwt_required()
+@response_cache.cached('products')
 def get_products():
-    """Get all products."""
-    products = Product.query.all()
-    product_list = [{"id": p.id, "name": p.name, "price": p.price, "stock": p.stock, "category_id": p.category_id} for p in products]
-    return jsonify(product_list)
+    """Get a page of products."""
+    return product_list_response(request.args, ("id", "name", "price", "stock", "category_id"))
 
 @main.route('/admin/product', methods=['POST'])
-@jwt_required()
+@admin_required
 def add_product():
     """Add a new product (Admin Only)."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-
     data = request.get_json()
     name = data.get('name')
     price = data.get('price')
@@ -178,45 +141,53 @@ def add_product():
     if not name or not price or not category_id:
         return jsonify({'error': 'Name, price, and category_id are required'}), 400
 
-    product = Product(name=name, price=price, stock=stock, category_id=category_id)
+    try:
+        price_cents = to_cents(price)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    product = Product(name=name, price_cents=price_cents, stock=stock, category_id=category_id)
     db.session.add(product)
     db.session.commit()
+    response_cache.invalidate('products')
+    event_hub.publish('products', 'product', product_delta(product))
 
     return jsonify({'message': 'Product added successfully', 'product_id': product.id})
 
 @main.route('/admin/product/<int:product_id>', methods=['PUT'])
-@jwt_required()
+@admin_required
 def update_product(product_id):
     """Update an existing product (Admin Only)."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-
     product = Product.query.get(product_id)
     if not product:
         return jsonify({'error': 'Product not found'}), 404
 
     data = request.get_json()
+    if 'price' in data:
+        try:
+            product.price_cents = to_cents(data['price'])
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
     product.name = data.get('name', product.name)
-    product.price = data.get('price', product.price)
     product.stock = data.get('stock', product.stock)
     product.category_id = data.get('category_id', product.category_id)
 
+    delta = product_delta(product)
     db.session.commit()
+    response_cache.invalidate('products')
+    event_hub.publish('products', 'product', delta)
     return jsonify({'message': 'Product updated successfully'})
 
 @main.route('/admin/product/<int:product_id>', methods=['DELETE'])
-@jwt_required()
+@admin_required
 def delete_product(product_id):
     """Delete a product (Admin Only)."""
-    user_id = get_jwt_identity()
-    if not is_admin(user_id):
-        return jsonify({'error': 'Unauthorized'}), 403
-
     product = Product.query.get(product_id)
     if not product:
         return jsonify({'error': 'Product not found'}), 404
 
     db.session.delete(product)
     db.session.commit()
+    response_cache.invalidate('products')
+    event_hub.publish('products', 'product.deleted', {'id': product_id})
     return jsonify({'message': 'Product deleted successfully'})
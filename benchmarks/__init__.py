@@ -0,0 +1,5 @@
+"""Reproducible load and latency benchmarks; run with ``python -m benchmarks``.
+
+Startup cost is measured separately with ``python -m benchmarks.startup``, and
+password hashing policies with ``python -m benchmarks.passwords``.
+"""
@@ -0,0 +1,109 @@
+"""Benchmark the auth, api, main and admin blueprints against a synthetic dataset.
+
+    python -m benchmarks --products 20000 --save baseline.json
+    python -m benchmarks --http --processes 4 --compare baseline.json
+"""
+from .dataset import DEFAULT_SIZES, seed
+from .loadgen import run_http
+from .runner import (run_in_process, environment, save_baseline, load_baseline, compare,
+                     format_results, format_comparison)
+from .scenarios import BLUEPRINTS, select_scenarios
+from datetime import datetime
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks', description=__doc__.splitlines()[0])
+    sizes = parser.add_argument_group('dataset')
+    for name, default in DEFAULT_SIZES.items():
+        sizes.add_argument(f"--{name.replace('_', '-')}", type=int, default=default, help=f'(default {default})')
+    sizes.add_argument('--seed', type=int, default=1, help='Random seed for data and requests (default 1)')
+
+    run = parser.add_argument_group('run')
+    run.add_argument('--blueprint', action='append', choices=BLUEPRINTS, help='Only these blueprints (repeatable)')
+    run.add_argument('--only', action='append', help='Only scenarios whose name starts with this (repeatable)')
+    run.add_argument('--iterations', type=int, default=200, help='Timed requests per scenario in-process (default 200)')
+    run.add_argument('--warmup', type=int, default=20, help='Untimed requests per scenario in-process (default 20)')
+    run.add_argument('--no-inprocess', action='store_true', help='Skip the test-client run')
+    run.add_argument('--http', action='store_true', help='Also load a live local server over HTTP')
+    run.add_argument('--processes', type=int, default=4, help='HTTP client processes (default 4)')
+    run.add_argument('--duration', type=float, default=5.0, help='Seconds of HTTP load per scenario (default 5)')
+    run.add_argument('--no-cache', action='store_true', help='Disable the response cache')
+    run.add_argument('--keep', action='store_true', help='Keep the temporary database directory')
+
+    out = parser.add_argument_group('baselines')
+    out.add_argument('--save', metavar='PATH', help='Write results as a JSON baseline')
+    out.add_argument('--compare', metavar='PATH', help='Compare results with a saved baseline')
+    out.add_argument('--tolerance', type=float, default=20.0, help='Allowed p95/throughput change in %% (default 20)')
+    out.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 on any regression')
+    return parser.parse_args(argv)
+
+
+def bench_config(workdir, no_cache):
+    return {
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'INVOICE_DIR': os.path.join(workdir, 'invoices'),
+        'CACHE_BACKEND': 'none' if no_cache else 'memory',
+        'RATELIMIT_BACKEND': 'none',  # measure the endpoints, not the throttle
+        'JWT_SECRET_KEY': 'benchmark-only-jwt-secret-key-0123456789',
+        # The report is the point; don't also log every request as slow
+        'METRICS_SLOW_REQUEST_MS': 10 ** 9,
+        'METRICS_SLOW_SQL_COUNT': 10 ** 9,
+    }
+
+
+def main(argv=None):
+    from backend import create_app, init_database
+
+    args = parse_args(argv)
+    sizes = {name: getattr(args, name) for name in DEFAULT_SIZES}
+    scenarios = select_scenarios(args.blueprint, args.only)
+    if not scenarios:
+        sys.exit('No scenarios match the given filters')
+
+    workdir = tempfile.mkdtemp(prefix='raasan-bench-')
+    config = bench_config(workdir, args.no_cache)
+    try:
+        app = create_app(config)
+        with app.app_context():
+            init_database()
+            ctx = seed(sizes, args.seed)
+        print(f'Seeded {workdir}: ' + ', '.join(f'{k}={v}' for k, v in sizes.items()))
+
+        report = {
+            'meta': {'created_at': datetime.utcnow().isoformat(timespec='seconds'), 'sizes': sizes, 'seed': args.seed,
+                     'cache': not args.no_cache, 'environment': environment()},
+            'results': {},
+        }
+        if not args.no_inprocess:
+            report['meta']['inprocess'] = {'iterations': args.iterations, 'warmup': args.warmup}
+            report['results']['inprocess'] = run_in_process(app, ctx, scenarios, args.iterations, args.warmup, args.seed)
+            print(format_results('inprocess', report['results']['inprocess']))
+        if args.http:
+            report['meta']['http'] = {'processes': args.processes, 'duration': args.duration}
+            report['results']['http'] = run_http(config, ctx, scenarios, args.processes, args.duration, seed=args.seed)
+            print(format_results('http', report['results']['http']))
+    finally:
+        if args.keep:
+            print(f'Kept {workdir}')
+        else:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    if args.save:
+        save_baseline(args.save, report)
+        print(f'Saved baseline to {args.save}')
+
+    if args.compare:
+        rows = compare(report, load_baseline(args.compare), args.tolerance)
+        print(f'Compared with {args.compare}:')
+        print(format_comparison(rows))
+        if args.fail_on_regression and any(row[-1] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
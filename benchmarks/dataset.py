@@ -0,0 +1,130 @@
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, insert, update
+from backend.models import db, User, UserRole, Category, Product, Cart, CartItem, Order, OrderItem
+from backend.passwords import password_hasher
+from backend.analytics import rebuild_rollups
+from flask_jwt_extended import create_access_token
+import random
+
+PASSWORD = 'benchmark-password'
+
+DEFAULT_SIZES = {
+    'users': 200,
+    'categories': 20,
+    'products': 5000,
+    'carts': 100,
+    'cart_items': 5,
+    'orders': 2000,
+    'order_items': 3,
+}
+
+WORDS = ('apple', 'banana', 'bread', 'butter', 'carrot', 'cheese', 'coffee', 'eggs', 'flour', 'honey',
+         'juice', 'lentils', 'mango', 'milk', 'oats', 'onion', 'pasta', 'rice', 'salt', 'tea', 'tomato', 'yogurt')
+
+
+def chunks(rows, size=1000):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+def bulk_insert(model, rows):
+    for chunk in chunks(rows):
+        db.session.execute(insert(model), chunk)
+
+
+def seed(sizes, rng_seed=1):
+    """Fill an empty database with a reproducible synthetic dataset.
+
+    Must run inside an app context. Returns the context scenarios need:
+    ids, e-mails and ready-made JWTs for users and the admin.
+    """
+    rng = random.Random(rng_seed)
+    now = datetime.utcnow()
+    # One hash shared by every user keeps seeding fast while logins still pay full cost
+    password = password_hasher.hash(PASSWORD)
+
+    admin = User.query.filter_by(role=UserRole.ADMIN).first()
+    admin.password = password
+
+    bulk_insert(User, [
+        {'email': f'user{i}@bench.test', 'name': f'User {i}', 'password': password, 'role': UserRole.USER}
+        for i in range(sizes['users'])
+    ])
+    bulk_insert(Category, [
+        {'name': f'Category {i}', 'description': f'{WORDS[i % len(WORDS)]} and friends'}
+        for i in range(sizes['categories'])
+    ])
+    db.session.flush()
+
+    user_ids = [u.id for u in User.query.filter_by(role=UserRole.USER).order_by(User.id)]
+    category_ids = [c.id for c in Category.query.order_by(Category.id)]
+
+    bulk_insert(Product, [
+        {
+            'name': f'{rng.choice(WORDS)} {rng.choice(WORDS)} {i}',
+            'price_cents': round(rng.uniform(0.5, 50) * 100),
+            'description': ' '.join(rng.choice(WORDS) for _ in range(8)),
+            'stock': rng.randint(0, 500),
+            'category_id': rng.choice(category_ids),
+        }
+        for i in range(sizes['products'])
+    ])
+    db.session.flush()
+    product_ids = [pid for (pid,) in db.session.query(Product.id).order_by(Product.id)]
+    prices = dict(db.session.query(Product.id, Product.price_cents))
+
+    cart_users = user_ids[:sizes['carts']]
+    bulk_insert(Cart, [{'user_id': uid} for uid in cart_users])
+    db.session.flush()
+    cart_ids = [c.id for c in Cart.query.order_by(Cart.id)]
+    bulk_insert(CartItem, [
+        {'cart_id': cid, 'product_id': pid, 'quantity': rng.randint(1, 3)}
+        for cid in cart_ids
+        for pid in rng.sample(product_ids, min(sizes['cart_items'], len(product_ids)))
+    ])
+
+    orders = []
+    for i in range(sizes['orders']):
+        orders.append({'user_id': rng.choice(user_ids), 'subtotal_cents': 0, 'total_cents': 0, 'status': 'Pending',
+                       'created_at': now - timedelta(minutes=rng.randint(0, 60 * 24 * 90))})
+    bulk_insert(Order, orders)
+    db.session.flush()
+    order_ids = [oid for (oid,) in db.session.query(Order.id).order_by(Order.id)]
+    items = [
+        {'order_id': oid, 'product_id': pid, 'quantity': rng.randint(1, 4), 'price_cents': prices[pid]}
+        for oid in order_ids
+        for pid in rng.sample(product_ids, min(sizes['order_items'], len(product_ids)))
+    ]
+    bulk_insert(OrderItem, items)
+
+    # Checkout writes each order's totals and line snapshot; do the same here
+    names = dict(db.session.query(Product.id, Product.name))
+    summaries = {oid: {'b_id': oid, 'b_total': 0, 'b_count': 0, 'b_lines': []} for oid in order_ids}
+    for item in items:
+        summary = summaries[item['order_id']]
+        summary['b_total'] += item['quantity'] * item['price_cents']
+        summary['b_count'] += item['quantity']
+        summary['b_lines'].append({'product_id': item['product_id'], 'name': names[item['product_id']],
+                                   'quantity': item['quantity'], 'price_cents': item['price_cents']})
+    set_summary = update(Order.__table__).where(Order.id == bindparam('b_id')).values(
+        subtotal_cents=bindparam('b_total'), total_cents=bindparam('b_total'),
+        item_count=bindparam('b_count'), lines=bindparam('b_lines', type_=Order.lines.type),
+    )
+    for chunk in chunks(list(summaries.values())):
+        db.session.execute(set_summary, chunk)
+    db.session.commit()
+    rebuild_rollups()
+
+    users = User.query.filter(User.id.in_(user_ids)).all()
+    return {
+        'user_ids': user_ids,
+        'emails': [u.email for u in users],
+        'tokens': [create_access_token(identity=u) for u in users],
+        'admin_token': create_access_token(identity=admin),
+        'admin_email': admin.email,
+        'password': PASSWORD,
+        'product_ids': product_ids,
+        'stocked_ids': [pid for (pid,) in db.session.query(Product.id).filter(Product.stock >= 100)],
+        'category_ids': category_ids,
+        'words': WORDS,
+    }
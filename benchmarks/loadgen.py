@@ -0,0 +1,132 @@
+from werkzeug.serving import make_server
+from .runner import summarize
+from .scenarios import BY_NAME
+import http.client
+import json
+import logging
+import multiprocessing
+import random
+import re
+import time
+
+METRIC_LINE = re.compile(r'^http_request_sql_statements_(sum|count)\{([^}]*)\} (\S+)$')
+
+
+# -----------------------------------
+# Server process
+# -----------------------------------
+def serve(config, ready):
+    """Run the app on a threaded local server and report its port."""
+    from backend import create_app
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    server = make_server('127.0.0.1', 0, create_app(config), threaded=True)
+    ready.put(server.port)
+    server.serve_forever()
+
+
+def start_server(config):
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve, args=(config, ready), name='bench-server', daemon=True)
+    process.start()
+    return process, ready.get(timeout=60)
+
+
+# -----------------------------------
+# Client processes
+# -----------------------------------
+def send(conn, req):
+    headers = {'Content-Type': 'application/json'}
+    if req['token']:
+        headers['Authorization'] = f"Bearer {req['token']}"
+    body = json.dumps(req['json']) if req['json'] is not None else None
+    conn.request(req['method'], req['path'], body=body, headers=headers)
+    response = conn.getresponse()
+    response.read()
+    return response.status
+
+
+def client(port, scenario_name, ctx, deadline, seed, results):
+    """Send requests back to back on one keep-alive connection until deadline."""
+    scenario = BY_NAME[scenario_name]
+    rng = random.Random(seed)
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    latencies, statuses = [], []
+    while time.time() < deadline:
+        req = scenario.build(rng, ctx)
+        for step in req['setup']:
+            send(conn, step)
+        start = time.perf_counter()
+        statuses.append(send(conn, req))
+        latencies.append(time.perf_counter() - start)
+    conn.close()
+    results.put((latencies, statuses))
+
+
+# -----------------------------------
+# SQL accounting via /metrics
+# -----------------------------------
+def sql_totals(port):
+    """(sum, count) of SQL statements per endpoint from the server's /metrics."""
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+    conn.request('GET', '/metrics')
+    text = conn.getresponse().read().decode()
+    conn.close()
+
+    totals = {}
+    for line in text.splitlines():
+        match = METRIC_LINE.match(line)
+        if not match:
+            continue
+        kind, labels, value = match.groups()
+        endpoint = re.search(r'endpoint="([^"]*)"', labels).group(1)
+        sums = totals.setdefault(endpoint, [0.0, 0.0])
+        sums[0 if kind == 'sum' else 1] += float(value)
+    return totals
+
+
+def load(port, scenario, ctx, processes, seconds, seed):
+    """Drive one scenario from several client processes for a fixed time."""
+    queue = multiprocessing.Queue()
+    deadline = time.time() + seconds
+    workers = [
+        multiprocessing.Process(target=client, args=(port, scenario.name, ctx, deadline, f'{seed}:{i}', queue))
+        for i in range(processes)
+    ]
+    start = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    latencies, statuses = [], []
+    for _ in workers:
+        lat, st = queue.get()
+        latencies += lat
+        statuses += st
+    for worker in workers:
+        worker.join()
+    return latencies, statuses, time.perf_counter() - start
+
+
+def run_http(config, ctx, scenarios, processes=4, duration=5.0, warmup=1.0, seed=1):
+    """Load each scenario from several client processes against a live server."""
+    server, port = start_server(config)
+    results = {}
+    try:
+        for scenario in scenarios:
+            if not scenario.http:
+                continue
+            if warmup:
+                load(port, scenario, ctx, processes, warmup, f'{seed}:{scenario.name}:warmup')
+
+            before = sql_totals(port).get(scenario.endpoint, [0.0, 0.0])
+            latencies, statuses, elapsed = load(port, scenario, ctx, processes, duration, f'{seed}:{scenario.name}')
+            after = sql_totals(port).get(scenario.endpoint, [0.0, 0.0])
+
+            summary = summarize(latencies, statuses, elapsed)
+            served = after[1] - before[1]
+            if served:
+                summary['sql_per_request'] = round((after[0] - before[0]) / served, 2)
+            results[scenario.name] = summary
+    finally:
+        server.terminate()
+        server.join()
+    return results
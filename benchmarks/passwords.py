@@ -0,0 +1,52 @@
+"""Measure verified logins per second for password hashing policies.
+
+    python -m benchmarks.passwords
+    python -m benchmarks.passwords --method scrypt:32768:8:1 --method pbkdf2:sha256:600000 --logins 128
+
+Logins run through the same bounded hashing pool the app uses, with twice
+as many concurrent clients as workers, so the numbers include queueing.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from backend.passwords import PasswordHasher
+import argparse
+import os
+import time
+
+METHODS = ('scrypt:32768:8:1', 'scrypt:16384:8:1', 'pbkdf2:sha256:600000', 'pbkdf2:sha256:260000')
+PASSWORD = 'correct horse battery staple'
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.passwords', description=__doc__.splitlines()[0])
+    parser.add_argument('--method', action='append', help='Hashing policy to measure (repeatable; default: a standard set)')
+    parser.add_argument('--logins', type=int, default=64, help='Logins verified per policy (default 64)')
+    parser.add_argument('--workers', type=int, help='Hashing pool size (default: CPU count)')
+    return parser.parse_args(argv)
+
+
+def measure(methods=METHODS, logins=64, workers=None):
+    """method -> logins per second and milliseconds of pool time per login."""
+    workers = workers or os.cpu_count() or 2
+    hasher = PasswordHasher()
+    results = {}
+    for method in methods:
+        hasher.configure(method, workers, logins, timeout=60)
+        stored = hasher.hash(PASSWORD)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers * 2) as clients:
+            list(clients.map(lambda _: hasher.verify(stored, PASSWORD), range(logins)))
+        elapsed = time.perf_counter() - start
+        results[method] = {'logins_per_second': round(logins / elapsed, 1),
+                           'ms_per_login': round(elapsed * 1000 / logins * workers, 1)}
+    hasher.executor.shutdown()
+    return results
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    for method, result in measure(args.method or METHODS, args.logins, args.workers).items():
+        print(f"{method:<24} {result['logins_per_second']:>8} logins/s  {result['ms_per_login']:>7} ms/login")
+
+
+if __name__ == '__main__':
+    main()
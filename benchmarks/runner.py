@@ -0,0 +1,165 @@
+from sqlalchemy import event
+from backend.models import db
+import json
+import math
+import platform
+import random
+import time
+
+
+# -----------------------------------
+# Statistics
+# -----------------------------------
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not ordered:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(latencies, statuses, elapsed, sql_statements=None):
+    """Latency percentiles (ms), throughput and error/SQL counts for one scenario."""
+    ordered = sorted(latencies)
+    count = len(ordered)
+    summary = {
+        'requests': count,
+        'errors': sum(1 for status in statuses if status >= 400),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 3),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 3),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 3),
+        'mean_ms': round(sum(ordered) / count * 1000, 3) if count else 0.0,
+        'throughput_rps': round(count / elapsed, 1) if elapsed else 0.0,
+        'sql_per_request': None,
+    }
+    if sql_statements is not None and count:
+        summary['sql_per_request'] = round(sql_statements / count, 2)
+    return summary
+
+
+# -----------------------------------
+# In-process runner (Flask test client)
+# -----------------------------------
+class StatementCounter:
+    """Counts SQL statements on every engine of the app."""
+
+    def __init__(self, app):
+        self.count = 0
+        with app.app_context():
+            self.engines = list(db.engines.values())
+        for engine in self.engines:
+            event.listen(engine, 'after_cursor_execute', self.increment)
+
+    def increment(self, *args):
+        self.count += 1
+
+    def close(self):
+        for engine in self.engines:
+            event.remove(engine, 'after_cursor_execute', self.increment)
+
+
+def send(client, req):
+    headers = {'Authorization': f"Bearer {req['token']}"} if req['token'] else {}
+    response = client.open(req['path'], method=req['method'], json=req['json'], headers=headers)
+    response.get_data()  # drain streamed bodies inside the timed window
+    return response.status_code
+
+
+def run_in_process(app, ctx, scenarios, iterations=200, warmup=20, seed=1):
+    """Time each scenario sequentially through the test client."""
+    client = app.test_client()
+    counter = StatementCounter(app)
+    results = {}
+    try:
+        for scenario in scenarios:
+            rng = random.Random(f'{seed}:{scenario.name}')
+            for _ in range(warmup):
+                req = scenario.build(rng, ctx)
+                for step in req['setup']:
+                    send(client, step)
+                send(client, req)
+
+            latencies, statuses, sql_statements, elapsed = [], [], 0, 0.0
+            for _ in range(iterations):
+                req = scenario.build(rng, ctx)
+                for step in req['setup']:
+                    send(client, step)
+                before = counter.count
+                start = time.perf_counter()
+                statuses.append(send(client, req))
+                took = time.perf_counter() - start
+                sql_statements += counter.count - before
+                latencies.append(took)
+                elapsed += took
+            results[scenario.name] = summarize(latencies, statuses, elapsed, sql_statements)
+    finally:
+        counter.close()
+    return results
+
+
+# -----------------------------------
+# Baselines
+# -----------------------------------
+def environment():
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+    }
+
+
+def save_baseline(path, report):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load_baseline(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def compare(report, baseline, tolerance=20.0):
+    """Rows of (mode, scenario, metric, before, after, change %, regressed).
+
+    Latency regresses when p95 grows by more than tolerance percent;
+    throughput when it drops by more than that; the SQL statement count is
+    deterministic, so any increase is a regression.
+    """
+    rows = []
+    for mode, results in report['results'].items():
+        for name, current in results.items():
+            previous = baseline.get('results', {}).get(mode, {}).get(name)
+            if not previous:
+                continue
+            for metric, higher_is_worse, limit in (('p95_ms', True, tolerance),
+                                                   ('throughput_rps', False, tolerance),
+                                                   ('sql_per_request', True, 0.0)):
+                before, after = previous.get(metric), current.get(metric)
+                if before is None or after is None:
+                    continue
+                change = (after - before) / before * 100 if before else 0.0
+                worse = change if higher_is_worse else -change
+                rows.append((mode, name, metric, before, after, round(change, 1), worse > limit))
+    return rows
+
+
+# -----------------------------------
+# Reporting
+# -----------------------------------
+def format_results(mode, results):
+    lines = [f'{mode}:',
+             f"  {'scenario':<24} {'reqs':>6} {'err':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'sql/req':>8}"]
+    for name, r in results.items():
+        sql = '-' if r['sql_per_request'] is None else f"{r['sql_per_request']:.2f}"
+        lines.append(f"  {name:<24} {r['requests']:>6} {r['errors']:>4} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} "
+                     f"{r['p99_ms']:>9.2f} {r['throughput_rps']:>8.1f} {sql:>8}")
+    return '\n'.join(lines)
+
+
+def format_comparison(rows):
+    lines = [f"  {'mode':<10} {'scenario':<24} {'metric':<16} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for mode, name, metric, before, after, change, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        lines.append(f'  {mode:<10} {name:<24} {metric:<16} {before:>10} {after:>10} {change:>+7.1f}%{flag}')
+    return '\n'.join(lines)
@@ -0,0 +1,148 @@
+BLUEPRINTS = ('auth', 'api', 'main', 'admin')
+
+
+class Scenario:
+    """One benchmarked request shape.
+
+    build(rng, ctx) returns the request to time as a dict with method, path,
+    json and token, plus an optional 'setup' list of requests that are sent
+    first without being timed (e.g. filling a cart before checkout).
+    """
+
+    def __init__(self, name, blueprint, endpoint, build, http=True):
+        self.name = name
+        self.blueprint = blueprint
+        self.endpoint = endpoint
+        self.build = build
+        self.http = http
+
+
+def request(method, path, json=None, token=None, setup=None):
+    return {'method': method, 'path': path, 'json': json, 'token': token, 'setup': setup or []}
+
+
+def user_token(rng, ctx):
+    return rng.choice(ctx['tokens'])
+
+
+# -----------------------------------
+# auth
+# -----------------------------------
+def login(rng, ctx):
+    i = rng.randrange(len(ctx['emails']))
+    return request('POST', '/auth/login', {'email': ctx['emails'][i], 'password': ctx['password']})
+
+
+def protected(rng, ctx):
+    return request('GET', '/auth/protected', token=user_token(rng, ctx))
+
+
+# -----------------------------------
+# api
+# -----------------------------------
+def product_list(rng, ctx):
+    return request('GET', '/api/products?limit=50')
+
+
+def product_filter(rng, ctx):
+    category_id = rng.choice(ctx['category_ids'])
+    low = rng.randint(0, 40)
+    return request('GET', f'/api/products?category_id={category_id}&min_price={low}&max_price={low + 10}&in_stock=1')
+
+
+def product_search(rng, ctx):
+    return request('GET', f"/api/products/search?q={rng.choice(ctx['words'])}")
+
+
+# -----------------------------------
+# main
+# -----------------------------------
+def cart_view(rng, ctx):
+    return request('GET', '/cart', token=user_token(rng, ctx))
+
+
+def cart_add(rng, ctx):
+    return request('POST', '/cart/add', {'product_id': rng.choice(ctx['stocked_ids']), 'quantity': 1},
+                   token=user_token(rng, ctx))
+
+
+def cart_patch(rng, ctx):
+    operations = [{'op': 'set', 'product_id': pid, 'quantity': rng.randint(1, 3)}
+                  for pid in rng.sample(ctx['stocked_ids'], 3)]
+    return request('PATCH', '/cart', {'operations': operations}, token=user_token(rng, ctx))
+
+
+def order_history(rng, ctx):
+    return request('GET', '/order/history', token=user_token(rng, ctx))
+
+
+def checkout(rng, ctx):
+    token = user_token(rng, ctx)
+    operations = [{'op': 'add', 'product_id': pid, 'quantity': 1} for pid in rng.sample(ctx['stocked_ids'], 3)]
+    return request('POST', '/order/place', token=token,
+                   setup=[request('PATCH', '/cart', {'operations': operations}, token=token)])
+
+
+# -----------------------------------
+# admin
+# -----------------------------------
+def admin_categories(rng, ctx):
+    return request('GET', '/admin/categories', token=ctx['admin_token'])
+
+
+def admin_products(rng, ctx):
+    return request('GET', '/admin/products?limit=50', token=ctx['admin_token'])
+
+
+def admin_product_update(rng, ctx):
+    return request('PUT', f"/admin/product/{rng.choice(ctx['product_ids'])}",
+                   {'price': round(rng.uniform(0.5, 50), 2)}, token=ctx['admin_token'])
+
+
+def admin_revenue(rng, ctx):
+    return request('GET', '/admin/reports/revenue?by=category', token=ctx['admin_token'])
+
+
+def admin_top_products(rng, ctx):
+    return request('GET', '/admin/reports/top-products', token=ctx['admin_token'])
+
+
+def admin_low_stock(rng, ctx):
+    return request('GET', '/admin/reports/low-stock?threshold=10', token=ctx['admin_token'])
+
+
+def admin_export(rng, ctx):
+    return request('GET', '/admin/products/export?format=ndjson', token=ctx['admin_token'])
+
+
+SCENARIOS = [
+    Scenario('auth.login', 'auth', 'auth.login', login),
+    Scenario('auth.protected', 'auth', 'auth.protected', protected),
+    Scenario('api.products', 'api', 'api.get_products', product_list),
+    Scenario('api.products_filtered', 'api', 'api.get_products', product_filter),
+    Scenario('api.search', 'api', 'api.search_products', product_search),
+    Scenario('main.cart', 'main', 'main.get_cart', cart_view),
+    Scenario('main.cart_add', 'main', 'main.add_to_cart', cart_add),
+    Scenario('main.cart_patch', 'main', 'main.update_cart', cart_patch),
+    Scenario('main.order_history', 'main', 'main.order_history', order_history),
+    Scenario('main.checkout', 'main', 'main.place_order', checkout, http=False),
+    Scenario('admin.categories', 'admin', 'admin.get_categories', admin_categories),
+    Scenario('admin.products', 'admin', 'admin.get_products', admin_products),
+    Scenario('admin.product_update', 'admin', 'admin.update_product', admin_product_update),
+    Scenario('admin.revenue', 'admin', 'admin.revenue_report', admin_revenue),
+    Scenario('admin.top_products', 'admin', 'admin.top_products_report', admin_top_products),
+    Scenario('admin.low_stock', 'admin', 'admin.low_stock_report', admin_low_stock),
+    Scenario('admin.export', 'admin', 'admin.export_products', admin_export),
+]
+
+BY_NAME = {s.name: s for s in SCENARIOS}
+
+
+def select_scenarios(blueprints=None, names=None):
+    """Scenarios filtered by blueprint and/or name prefix."""
+    chosen = SCENARIOS
+    if blueprints:
+        chosen = [s for s in chosen if s.blueprint in blueprints]
+    if names:
+        chosen = [s for s in chosen if any(s.name.startswith(n) for n in names)]
+    return chosen
@@ -0,0 +1,183 @@
+"""Measure cold-start cost: importing the app, create_app() and init_database().
+
+    python -m benchmarks.startup --budget-ms 900  # default STARTUP_BUDGET_MS or 1500
+    python -m benchmarks.startup --save startup.json
+    python -m benchmarks.startup --compare startup.json --fail-on-regression
+
+Every run is a fresh interpreter under ``python -X importtime``. "warm" runs
+reuse a primed bytecode cache, like a worker started from a built image;
+"cold" runs start with an empty one, like the first boot after a deploy.
+"""
+from .runner import percentile, environment, save_baseline, load_baseline
+from datetime import datetime
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = ('import_ms', 'create_app_ms', 'init_db_ms', 'total_ms')
+# Median warm total allowed by default; tests/test_startup.py enforces it too
+DEFAULT_BUDGET_MS = float(os.environ.get('STARTUP_BUDGET_MS', 1500))
+
+# Runs in the child interpreter; prints one JSON line of phase timings
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+from backend import create_app, init_database
+imported = time.perf_counter()
+app = create_app({'SQLALCHEMY_DATABASE_URI': sys.argv[1]})
+created = time.perf_counter()
+with app.app_context():
+    init_database()
+done = time.perf_counter()
+print(json.dumps({'import_ms': (imported - start) * 1000, 'create_app_ms': (created - imported) * 1000,
+                  'init_db_ms': (done - created) * 1000, 'total_ms': (done - start) * 1000}))
+"""
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.startup', description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='Interpreter starts per mode (default 5)')
+    parser.add_argument('--mode', action='append', choices=('warm', 'cold'), help='Only these modes (repeatable)')
+    parser.add_argument('--top', type=int, default=10, help='Heaviest imported packages to list (default 10)')
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help=f'Exit with status 1 if the median warm total exceeds this (default {DEFAULT_BUDGET_MS:g})')
+    parser.add_argument('--save', metavar='PATH', help='Write results as a JSON baseline')
+    parser.add_argument('--compare', metavar='PATH', help='Compare results with a saved baseline')
+    parser.add_argument('--tolerance', type=float, default=20.0, help='Allowed median change in %% (default 20)')
+    parser.add_argument('--fail-on-regression', action='store_true', help='Exit with status 1 on any regression')
+    return parser.parse_args(argv)
+
+
+# -----------------------------------
+# Measuring
+# -----------------------------------
+def import_costs(stderr):
+    """Milliseconds of -X importtime self time per top-level package."""
+    costs = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, name = line[len('import time:'):].split('|')
+        package = name.strip().split('.')[0]
+        costs[package] = costs.get(package, 0.0) + int(self_us) / 1000
+    return costs
+
+
+def probe(database_uri, pycache):
+    """Start one interpreter; returns its phase timings and per-package import costs."""
+    env = {k: v for k, v in os.environ.items() if k != 'PYTHONDONTWRITEBYTECODE'}
+    env['PYTHONPYCACHEPREFIX'] = pycache
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', PROBE, database_uri],
+                            cwd=ROOT, env=env, capture_output=True, text=True)
+    if result.returncode != 0:
+        sys.exit(f'Startup probe failed:\n{result.stderr[-2000:]}')
+    return json.loads(result.stdout.strip().splitlines()[-1]), import_costs(result.stderr)
+
+
+def measure(mode, runs, database_uri, workdir):
+    """Median phase timings and package import costs over runs interpreter starts."""
+    timings, costs = [], []
+    warm_cache = os.path.join(workdir, 'pycache-warm')
+    if mode == 'warm':
+        probe(database_uri, warm_cache)  # untimed: fills the bytecode cache
+    for i in range(runs):
+        pycache = warm_cache if mode == 'warm' else os.path.join(workdir, f'pycache-cold-{i}')
+        run_timings, run_costs = probe(database_uri, pycache)
+        timings.append(run_timings)
+        costs.append(run_costs)
+
+    summary = {phase: round(percentile(sorted(t[phase] for t in timings), 50), 1) for phase in PHASES}
+    packages = {name for run in costs for name in run}
+    summary['packages_ms'] = {
+        name: round(percentile(sorted(run.get(name, 0.0) for run in costs), 50), 1) for name in packages
+    }
+    return summary
+
+
+def profile(modes=('warm', 'cold'), runs=5):
+    """mode -> median timings, measured against a throwaway SQLite database."""
+    workdir = tempfile.mkdtemp(prefix='raasan-startup-')
+    database_uri = f"sqlite:///{os.path.join(workdir, 'startup.db')}"
+    try:
+        probe(database_uri, os.path.join(workdir, 'pycache-warm'))  # creates the schema once
+        return {mode: measure(mode, runs, database_uri, workdir) for mode in modes}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+# -----------------------------------
+# Reporting
+# -----------------------------------
+def format_results(results, top):
+    lines = [f"  {'mode':<6} " + ' '.join(f'{phase[:-3]:>12}' for phase in PHASES)]
+    for mode, r in results.items():
+        lines.append(f'  {mode:<6} ' + ' '.join(f'{r[phase]:>12.1f}' for phase in PHASES))
+    for mode, r in results.items():
+        heaviest = sorted(r['packages_ms'].items(), key=lambda item: -item[1])[:top]
+        lines.append(f'  {mode} imports (self ms): ' + ', '.join(f'{name} {ms:.1f}' for name, ms in heaviest))
+    return '\n'.join(lines)
+
+
+def compare(results, baseline, tolerance=20.0):
+    """Rows of (mode, phase, before, after, change %, regressed); a phase regresses past tolerance."""
+    rows = []
+    for mode, current in results.items():
+        previous = baseline.get('results', {}).get(mode)
+        if not previous:
+            continue
+        for phase in PHASES:
+            before, after = previous.get(phase), current.get(phase)
+            if before is None or after is None:
+                continue
+            change = (after - before) / before * 100 if before else 0.0
+            rows.append((mode, phase, before, after, round(change, 1), change > tolerance))
+    return rows
+
+
+def format_comparison(rows):
+    lines = [f"  {'mode':<6} {'phase':<14} {'baseline':>10} {'current':>10} {'change':>8}"]
+    for mode, phase, before, after, change, regressed in rows:
+        flag = '  REGRESSION' if regressed else ''
+        lines.append(f'  {mode:<6} {phase:<14} {before:>10} {after:>10} {change:>+7.1f}%{flag}')
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = profile(args.mode or ['warm', 'cold'], args.runs)
+    print(f'Startup over {args.runs} runs, median ms:')
+    print(format_results(results, args.top))
+
+    failed = False
+    if 'warm' in results:
+        total = results['warm']['total_ms']
+        within = total <= args.budget_ms
+        print(f"Budget: warm total {total:.1f} ms {'within' if within else 'OVER'} {args.budget_ms:.1f} ms")
+        failed = not within
+
+    report = {
+        'meta': {'created_at': datetime.utcnow().isoformat(timespec='seconds'), 'runs': args.runs,
+                 'environment': environment()},
+        'results': results,
+    }
+    if args.save:
+        save_baseline(args.save, report)
+        print(f'Saved baseline to {args.save}')
+
+    if args.compare:
+        rows = compare(results, load_baseline(args.compare), args.tolerance)
+        print(f'Compared with {args.compare}:')
+        print(format_comparison(rows))
+        failed = failed or (args.fail_on_regression and any(row[-1] for row in rows))
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
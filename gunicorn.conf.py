@@ -0,0 +1,53 @@
+"""gunicorn settings: gunicorn -c gunicorn.conf.py wsgi:app
+
+Everything is environment-driven so the same file serves every deployment.
+Run "flask --app wsgi init-db" once before starting workers.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('BIND', f"0.0.0.0:{os.environ.get('PORT', '8000')}")
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+# Each open /events stream holds a thread for up to EVENTS_MAX_STREAM_SECONDS. By default
+# streams get WEB_THREADS minus EVENTS_RESERVED_THREADS per worker; raise WEB_THREADS for more
+threads = int(os.environ.get('WEB_THREADS', 4))
+worker_class = 'gthread' if threads > 1 else 'sync'
+timeout = int(os.environ.get('WEB_TIMEOUT', 30))
+keepalive = int(os.environ.get('WEB_KEEPALIVE', 5))
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 0))
+max_requests_jitter = max_requests // 10
+
+# Import the app once in the master and fork it, instead of once per worker
+preload_app = os.environ.get('WEB_PRELOAD', '1') == '1'
+
+# SIGTERM: fail /readyz for SHUTDOWN_DRAIN_SECONDS, then finish in-flight requests
+drain_seconds = float(os.environ.get('SHUTDOWN_DRAIN_SECONDS', 5))
+graceful_timeout = int(os.environ.get('WEB_GRACEFUL_TIMEOUT', 30)) + int(drain_seconds)
+
+accesslog = os.environ.get('WEB_ACCESS_LOG')  # e.g. "-" for stdout
+errorlog = '-'
+
+
+def when_ready(server):
+    if worker_class == 'sync' and os.environ.get('EVENTS_BACKEND', 'memory') != 'none':
+        server.log.warning('WEB_THREADS=1 runs sync workers, which refuse /events streams; '
+                           'set WEB_THREADS > 1 or EVENTS_BACKEND=none')
+    if workers > 1 and os.environ.get('CACHE_BACKEND', 'memory') == 'memory':
+        server.log.warning('CACHE_BACKEND=memory is per worker: the other workers serve stale catalog '
+                           'responses for up to CACHE_MEMORY_TTL seconds; set CACHE_BACKEND=redis to share it')
+
+
+def post_fork(server, worker):
+    if preload_app:
+        from backend.serving import after_fork
+        after_fork(server.app.wsgi())
+
+
+def post_worker_init(worker):
+    from backend.serving import install_drain_handler
+    install_drain_handler(drain_seconds, worker.handle_exit)
+
+
+def worker_exit(server, worker):
+    from backend.serving import shutdown
+    shutdown(worker.wsgi)
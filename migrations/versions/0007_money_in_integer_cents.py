@@ -0,0 +1,81 @@
+"""money in integer cents
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-17 19:41:07.512633
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+# (table, float column, cents column, cents type); "order" is quoted as a reserved word
+MONEY_COLUMNS = (
+    ('product', 'price', 'price_cents', sa.Integer()),
+    ('order_item', 'price', 'price_cents', sa.Integer()),
+    ('daily_sales', 'revenue', 'revenue_cents', sa.BigInteger()),
+    ('product_sales', 'revenue', 'revenue_cents', sa.BigInteger()),
+)
+
+
+def upgrade():
+    # Add the cents columns as nullable, backfill them from the float columns,
+    # then tighten them and drop the floats.
+    for table, old, new, type_ in MONEY_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column(new, type_, nullable=True))
+        op.execute(f'UPDATE {table} SET {new} = CAST(ROUND({old} * 100) AS INTEGER)')
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('subtotal_cents', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('discount_cents', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('tax_cents', sa.BigInteger(), nullable=True))
+        batch_op.add_column(sa.Column('total_cents', sa.BigInteger(), nullable=True))
+    op.execute('UPDATE "order" SET subtotal_cents = CAST(ROUND(total_amount * 100) AS INTEGER), '
+               'discount_cents = 0, tax_cents = 0, total_cents = CAST(ROUND(total_amount * 100) AS INTEGER)')
+
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_price'))
+
+    for table, old, new, type_ in MONEY_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(new, existing_type=type_, nullable=False)
+            batch_op.drop_column(old)
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        for column in ('subtotal_cents', 'discount_cents', 'tax_cents', 'total_cents'):
+            batch_op.alter_column(column, existing_type=sa.BigInteger(), nullable=False)
+        batch_op.drop_column('total_amount')
+
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_product_price_cents'), ['price_cents'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_product_price_cents'))
+
+    for table, old, new, type_ in MONEY_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column(old, sa.Float(), nullable=True))
+        op.execute(f'UPDATE {table} SET {old} = {new} / 100.0')
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.alter_column(old, existing_type=sa.Float(), nullable=False)
+            batch_op.drop_column(new)
+
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('total_amount', sa.Float(), nullable=True))
+    op.execute('UPDATE "order" SET total_amount = total_cents / 100.0')
+    with op.batch_alter_table('order', schema=None) as batch_op:
+        batch_op.alter_column('total_amount', existing_type=sa.Float(), nullable=False)
+        for column in ('total_cents', 'tax_cents', 'discount_cents', 'subtotal_cents'):
+            batch_op.drop_column(column)
+
+    with op.batch_alter_table('product', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_product_price'), ['price'], unique=False)
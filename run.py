@@ -1,8 +1,14 @@
 import os
 os.environ["PYTHONDONTWRITEBYTECODE"] = "1"
-from backend import create_app
+from backend import create_app, init_database
 
-app =  create_app()
+app = create_app()
 if __name__ == '__main__':
-    app.run(debug=True)  
-    
\ No newline at end of file
+    # Development server only; production runs wsgi:app under gunicorn
+    with app.app_context():
+        init_database()
+    app.run(
+        host=os.environ.get('HOST', '127.0.0.1'),
+        port=int(os.environ.get('PORT', 5000)),
+        debug=os.environ.get('FLASK_DEBUG', '0') == '1',
+    )
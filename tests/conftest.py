@@ -0,0 +1,76 @@
+"""Shared fixtures: a fresh app on its own SQLite file (WAL, as in production) per test."""
+from flask_jwt_extended import create_access_token
+from backend import create_app, init_database
+from backend.models import Category, Product, User, UserRole, db
+from benchmarks.runner import StatementCounter
+import pytest
+
+
+@pytest.fixture
+def app_config():
+    """Extra settings for the app fixture; override this fixture in a test module to change them."""
+    return {}
+
+
+@pytest.fixture
+def app(tmp_path, app_config):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'test.db'}",
+        'INVOICE_DIR': str(tmp_path / 'invoices'),
+        'PASSWORD_HASH_METHOD': 'pbkdf2:sha256:1000',  # fast; the policy itself is not under test
+        'JWT_SECRET_KEY': 'test-only-jwt-secret-key-0123456789abcdef',
+        'CACHE_BACKEND': 'none',
+        'RATELIMIT_BACKEND': 'none',
+        'METRICS_SLOW_REQUEST_MS': 10 ** 9,
+        'METRICS_SLOW_SQL_COUNT': 10 ** 9,
+        **app_config,
+    })
+    with app.app_context():
+        init_database()
+    yield app
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def make_user(app):
+    """Factory: make_user(email, role) -> (user id, Authorization headers)."""
+    def make(email, role=UserRole.USER):
+        with app.app_context():
+            user = User(email=email, password='unused', role=role)
+            db.session.add(user)
+            db.session.commit()
+            return user.id, {'Authorization': f'Bearer {create_access_token(identity=user)}'}
+    return make
+
+
+@pytest.fixture
+def make_product(app):
+    """Factory: make_product(stock, price_cents, category) -> product id."""
+    def make(stock=10, price_cents=100, category='Produce', name='Apple'):
+        with app.app_context():
+            category_id = db.session.scalar(db.select(Category.id).filter_by(name=category))
+            if category_id is None:
+                row = Category(name=category)
+                db.session.add(row)
+                db.session.flush()
+                category_id = row.id
+            product = Product(name=name, price_cents=price_cents, stock=stock, category_id=category_id)
+            db.session.add(product)
+            db.session.commit()
+            return product.id
+    return make
+
+
+@pytest.fixture
+def statements(app):
+    """Running count of SQL statements executed on the app's engines."""
+    counter = StatementCounter(app)
+    yield counter
+    counter.close()
@@ -0,0 +1,72 @@
+from backend.bulk import import_products
+from backend.models import Product, db
+import io
+import json
+
+
+def ndjson(rows):
+    return io.BytesIO('\n'.join(json.dumps(row) for row in rows).encode())
+
+
+def test_malformed_rows_are_reported_alone(app, make_product):
+    make_product(category='Fruit')
+    rows = [
+        {'name': 'Kiwi', 'price': 1, 'category': 'Fruit', 'stock': 3},
+        {'name': 'Bad category', 'price': 1, 'category': ['Fruit']},
+        {'name': {'en': 'Bad name'}, 'price': 1, 'category': 'Fruit'},
+        {'name': 'Bad description', 'price': 1, 'category': 'Fruit', 'description': 5},
+        {'name': 'Fractional stock', 'price': 1, 'category': 'Fruit', 'stock': 2.9},
+        {'name': 'Fractional id', 'price': 1, 'category': 'Fruit', 'id': '2.5'},
+        {'name': 'Mango', 'price': 2, 'category': 'Fruit', 'stock': 4.0},
+    ]
+    with app.app_context():
+        report = import_products(ndjson(rows), 'ndjson')
+        names = set(db.session.scalars(db.select(Product.name)))
+
+    assert report['written'] == 2
+    assert [(e['row'], e['error']) for e in report['errors']] == [
+        (2, 'category must be a string'),
+        (3, 'name must be a string'),
+        (4, 'description must be a string'),
+        (5, 'stock must be an integer'),
+        (6, 'id must be an integer'),
+    ]
+    assert {'Kiwi', 'Mango'} <= names
+
+
+def test_out_of_range_values_are_reported_alone(app, make_product):
+    make_product(category='Fruit')
+    rows = [
+        {'name': 'Kiwi', 'price': 1, 'category': 'Fruit'},
+        {'name': 'Huge stock', 'price': 1, 'category': 'Fruit', 'stock': 99999999999999999999},
+        {'name': 'Huge id', 'price': 1, 'category': 'Fruit', 'id': str(2**31)},
+        {'name': 'Huge price', 'price': 1e30, 'category': 'Fruit'},
+        {'name': 'Mango', 'price': 2, 'category': 'Fruit'},
+    ]
+    with app.app_context():
+        report = import_products(ndjson(rows), 'ndjson')
+
+    assert report['written'] == 2
+    assert [(e['row'], e['error']) for e in report['errors']] == [
+        (2, 'stock is out of range'),
+        (3, 'id is out of range'),
+        (4, 'price must be a non-negative number'),
+    ]
+
+
+def test_undecodable_rows_are_reported_alone(app, make_product):
+    make_product(category='Fruit')
+    csv_body = b'\xef\xbb\xbfname,price,category\nKiwi,1,Fruit\n' + b'Bad \xff,1,Fruit\n' + b'Mango,2,Fruit\n'
+    ndjson_body = b'{"name": "Bad \xff", "price": 1, "category": "Fruit"}\n' + ndjson([
+        {'name': 'Pear', 'price': 1, 'category': 'Fruit'},
+    ]).getvalue()
+    with app.app_context():
+        csv_report = import_products(io.BytesIO(csv_body), 'csv')
+        ndjson_report = import_products(io.BytesIO(ndjson_body), 'ndjson')
+        names = set(db.session.scalars(db.select(Product.name)))
+
+    assert csv_report['written'] == 2
+    assert csv_report['errors'] == [{'row': 2, 'error': 'Row is not valid UTF-8'}]
+    assert ndjson_report['written'] == 1
+    assert ndjson_report['errors'] == [{'row': 1, 'error': 'Row is not valid UTF-8'}]
+    assert {'Kiwi', 'Mango', 'Pear'} <= names
@@ -0,0 +1,57 @@
+from backend.cache import MemoryBackend, response_cache
+from flask import Response
+import pytest
+import time
+
+
+@pytest.fixture
+def app_config():
+    return {'CACHE_BACKEND': 'memory'}
+
+
+def test_cached_categories_are_a_complete_body(client, make_user, make_product):
+    make_product(category='Fruit')
+    _, headers = make_user('viewer@example.com')
+    first = client.get('/admin/categories', headers=headers)
+    assert first.status_code == 200
+    assert first.headers['Content-Length'] == str(len(first.get_data()))
+    assert [c['name'] for c in first.get_json()] == ['Fruit']
+
+    again = client.get('/admin/categories', headers={**headers, 'If-None-Match': first.headers['ETag']})
+    assert again.status_code == 304
+
+
+def test_streamed_responses_are_not_cached(app):
+    calls = []
+
+    @app.route('/_stream')
+    @response_cache.cached('stream')
+    def stream():
+        calls.append(1)
+        return Response(iter(['[', ']']), mimetype='application/json')
+
+    client = app.test_client()
+    for _ in range(2):
+        response = client.get('/_stream')
+        assert response.get_data() == b'[]'
+        assert 'Content-Length' not in response.headers and 'ETag' not in response.headers
+    assert len(calls) == 2
+
+
+def test_version_stamps_outlive_evicted_entries():
+    backend = MemoryBackend(max_entries=2)
+    backend.set_version('products', '1')
+    for i in range(5):
+        backend.set(f'products:1:/page/{i}', {'body': '[]'})
+    assert backend.get_version('products') == '1'
+    assert backend.get('products:1:/page/0') is None
+
+
+def test_memory_entries_are_capped_at_the_memory_ttl(monkeypatch):
+    backend = MemoryBackend(max_ttl=10)
+    backend.set('key', 'value', ttl=300)
+    backend.set_version('products', '1')
+    later = time.monotonic() + 11
+    monkeypatch.setattr(time, 'monotonic', lambda: later)
+    assert backend.get('key') is None
+    assert backend.get_version('products') is None
@@ -0,0 +1,19 @@
+from backend.cart import CartError, fold_operations
+import pytest
+
+
+@pytest.mark.parametrize('body', [{'quantity': True}, {'quantity': 1.0}, {'product_id': True, 'quantity': 1}])
+def test_add_rejects_non_integers(client, make_user, make_product, body):
+    product_id = make_product()
+    _, headers = make_user('shopper@example.com')
+    response = client.post('/cart/add', json={'product_id': product_id, **body}, headers=headers)
+    assert response.status_code == 400
+    assert client.get('/cart', headers=headers).get_json().get('items', []) == []
+
+
+@pytest.mark.parametrize('op', [{'op': 'add', 'product_id': 1, 'quantity': True},
+                                {'op': 'set', 'product_id': 1, 'quantity': False},
+                                {'op': 'remove', 'product_id': True}])
+def test_operations_reject_booleans(op):
+    with pytest.raises(CartError):
+        fold_operations([op])
@@ -0,0 +1,17 @@
+import pytest
+
+
+@pytest.mark.parametrize('query', ['min_price=abc', 'max_price=1,5', 'min_price=-1', 'max_price=nan', 'category_id=x'])
+def test_malformed_filters_are_rejected(client, make_product, query):
+    make_product()
+    response = client.get(f'/api/products?{query}')
+    assert response.status_code == 400
+    assert 'error' in response.get_json()
+
+
+def test_price_filters_apply(client, make_product):
+    make_product(name='Cheap', price_cents=150)
+    make_product(name='Dear', price_cents=2500)
+    response = client.get('/api/products?min_price=1.5&max_price=10')
+    assert response.status_code == 200
+    assert [item['name'] for item in response.get_json()] == ['Cheap']
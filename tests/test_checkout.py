@@ -0,0 +1,46 @@
+from backend.models import Cart, CartItem, Order, Product, db
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import threading
+
+STOCK = 10
+HOLDERS = 5   # add through the API, so their units are held
+SHOPPERS = 20  # lines whose hold already expired, competing for free stock
+
+
+def test_concurrent_checkouts_never_oversell(app, make_user, make_product):
+    product_id = make_product(stock=STOCK)
+    users = [make_user(f'shopper{i}@example.com') for i in range(HOLDERS + SHOPPERS)]
+
+    client = app.test_client()
+    for _, headers in users[:HOLDERS]:
+        assert client.post('/cart/add', json={'product_id': product_id, 'quantity': 1}, headers=headers).status_code == 200
+    with app.app_context():
+        for user_id, _ in users[HOLDERS:]:
+            cart = Cart(user_id=user_id)
+            db.session.add(cart)
+            db.session.flush()
+            db.session.add(CartItem(cart_id=cart.id, product_id=product_id, quantity=1, added_at=datetime.utcnow()))
+        db.session.commit()
+
+    start = threading.Barrier(len(users))
+
+    def checkout(headers):
+        client = app.test_client()
+        start.wait()
+        for _ in range(10):
+            response = client.post('/order/place', headers=headers)
+            # Lock timeouts surface as a retryable conflict; stock shortages are final
+            if response.status_code != 409 or 'retry' not in response.get_json()['error']:
+                return response.status_code
+
+    with ThreadPoolExecutor(max_workers=len(users)) as pool:
+        statuses = list(pool.map(checkout, [headers for _, headers in users]))
+
+    assert statuses[:HOLDERS] == [201] * HOLDERS  # held units are never sold to someone else
+    assert statuses.count(201) == STOCK
+    assert set(statuses) == {201, 409}
+    with app.app_context():
+        product = db.session.get(Product, product_id)
+        assert (product.stock, product.reserved) == (0, 0)
+        assert db.session.scalar(db.select(db.func.count(Order.id))) == STOCK
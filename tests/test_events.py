@@ -0,0 +1,23 @@
+THREADED = {'wsgi.multithread': True}
+
+
+def test_streams_are_refused_on_a_sync_worker(client):
+    response = client.get('/events', environ_overrides={'wsgi.multithread': False})
+    assert response.status_code == 503
+
+
+def test_streams_leave_threads_for_other_requests(app, client):
+    limit = app.config['EVENTS_MAX_CONNECTIONS']
+    assert limit >= 1
+    streams = [client.get('/events', environ_overrides=THREADED, buffered=False) for _ in range(limit)]
+    assert [s.status_code for s in streams] == [200] * limit
+
+    refused = client.get('/events', environ_overrides=THREADED)
+    assert refused.status_code == 503
+    assert refused.headers['Retry-After']
+
+    for stream in streams:
+        stream.close()  # disconnecting frees the slot
+    reopened = client.get('/events', environ_overrides=THREADED, buffered=False)
+    assert reopened.status_code == 200
+    reopened.close()
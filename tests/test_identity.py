@@ -0,0 +1,44 @@
+from backend.models import UserRole, db
+from sqlalchemy import event
+import pytest
+import re
+
+
+@pytest.fixture
+def sql_log(app):
+    """Every SQL statement the app runs while the test is active."""
+    log = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        log.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', record)
+    yield log
+    event.remove(engine, 'before_cursor_execute', record)
+
+
+def reads_users(log):
+    return [statement for statement in log if re.search(r'\b(FROM|JOIN) "?user"?\b', statement)]
+
+
+def test_protected_route_runs_no_queries(client, make_user, sql_log):
+    user_id, headers = make_user('reader@example.com')
+    sql_log.clear()
+    response = client.get('/auth/protected', headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['user_id'] == user_id
+    assert sql_log == []
+
+
+def test_admin_check_reads_role_from_token(client, make_user, sql_log):
+    _, user_headers = make_user('shopper@example.com')
+    _, admin_headers = make_user('boss@example.com', role=UserRole.ADMIN)
+    sql_log.clear()
+
+    assert client.post('/admin/category', json={'name': 'Dairy'}, headers=user_headers).status_code == 403
+    assert sql_log == []
+
+    assert client.post('/admin/category', json={'name': 'Dairy'}, headers=admin_headers).status_code == 200
+    assert sql_log and reads_users(sql_log) == []
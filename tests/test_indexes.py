@@ -0,0 +1,41 @@
+from backend.archive import summary_select
+from backend.catalog import product_filters
+from backend.models import CartItem, Order, OrderItem, Product, User, UserRole, db
+from sqlalchemy import select
+from werkzeug.datastructures import MultiDict
+import pytest
+
+
+def query_plan(statement):
+    """SQLite's EXPLAIN QUERY PLAN detail lines for a statement."""
+    sql = statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+    with db.engine.connect() as connection:
+        return [row[-1] for row in connection.exec_driver_sql(f'EXPLAIN QUERY PLAN {sql}')]
+
+
+def cart_query(cart_id):
+    return (select(CartItem.product_id, CartItem.quantity, Product.price_cents)
+            .join(Product, Product.id == CartItem.product_id).where(CartItem.cart_id == cart_id))
+
+
+def catalog_query(**args):
+    return select(Product.id, Product.name).where(*product_filters(MultiDict(args))).order_by(Product.id).limit(51)
+
+
+HOT_QUERIES = {
+    'cart lookup': (lambda: cart_query(1), 'cart_item', 'ix_cart_item_cart_id_product_id'),
+    'order items': (lambda: select(OrderItem).where(OrderItem.order_id == 1), 'order_item', 'ix_order_item_order_id'),
+    'order history': (lambda: summary_select(Order.__table__, 1).limit(21), 'order', 'ix_order_user_id_created_at'),
+    'category filter': (lambda: catalog_query(category_id='1'), 'product', 'ix_product_category_id'),
+    'price filter': (lambda: catalog_query(min_price='1', max_price='2'), 'product', 'ix_product_price_cents'),
+    'admin lookup': (lambda: select(User.id).where(User.role == UserRole.ADMIN).limit(1), 'user', 'ix_user_role'),
+}
+
+
+@pytest.mark.parametrize('name', HOT_QUERIES)
+def test_hot_query_uses_its_index(app, name):
+    build, table, index = HOT_QUERIES[name]
+    with app.app_context():
+        plan = query_plan(build())
+    assert any(line.split()[:2] == ['SEARCH', table] and f'INDEX {index} ' in line for line in plan), plan
+    assert not any(line.split()[:2] == ['SCAN', table] for line in plan), plan
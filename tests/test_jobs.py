@@ -0,0 +1,23 @@
+from backend.jobs import purge_done
+from backend.models import Job, db
+from datetime import datetime, timedelta
+
+
+def test_purge_deletes_only_old_finished_jobs(app):
+    old = datetime.utcnow() - timedelta(days=app.config['JOB_RETENTION_DAYS'] + 1)
+    with app.app_context():
+        db.session.add_all(
+            [Job(kind='order.placed', status='done', run_at=old) for _ in range(5)]
+            + [Job(kind='order.placed', status='done', run_at=datetime.utcnow()),
+               Job(kind='order.placed', status='failed', run_at=old)]
+        )
+        db.session.commit()
+
+        assert purge_done(batch_size=2) == 5
+        remaining = db.session.execute(db.select(Job.kind, Job.status)).all()
+
+    # The fresh and failed jobs stay, as do the periodic jobs init-db queued (purge included)
+    assert ('order.placed', 'done') in remaining
+    assert ('order.placed', 'failed') in remaining
+    assert ('jobs.purge', 'queued') in remaining
+    assert len([row for row in remaining if row.kind == 'order.placed']) == 2
@@ -0,0 +1,32 @@
+import pytest
+
+
+def place_orders(client, headers, product_ids, count):
+    for _ in range(count):
+        for product_id in product_ids:
+            assert client.post('/cart/add', json={'product_id': product_id, 'quantity': 1}, headers=headers).status_code == 200
+        assert client.post('/order/place', headers=headers).status_code == 201
+
+
+def history_statements(client, headers, statements, query=''):
+    before = statements.count
+    response = client.get(f'/order/history{query}', headers=headers)
+    assert response.status_code == 200
+    return statements.count - before, len(response.get_json())
+
+
+@pytest.mark.parametrize('query', ['', '?limit=100'])
+def test_history_statement_count_does_not_grow_with_orders(client, make_user, make_product, statements, query):
+    product_ids = [make_product(stock=1000, name='Apple'), make_product(stock=1000, name='Pear')]
+    counts = {}
+    for orders in (5, 50):
+        _, headers = make_user(f'history{orders}@example.com')
+        place_orders(client, headers, product_ids, orders)
+        counts[orders] = history_statements(client, headers, statements, query)
+
+    # The page size depends on the limit; the number of statements does not
+    assert counts[5][1] == 5
+    assert counts[50][1] == (20 if not query else 50)
+    assert counts[5][0] <= 2 and counts[50][0] <= 2
+    if query:
+        assert counts[5][0] == counts[50][0]
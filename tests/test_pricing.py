@@ -0,0 +1,27 @@
+from backend.models import UserRole
+from backend.pricing import MAX_CENTS, to_cents
+import pytest
+
+
+@pytest.mark.parametrize('value', ['1e26', '1e400', 1e300, '9' * 40])
+def test_huge_amounts_are_value_errors(value):
+    with pytest.raises(ValueError):
+        to_cents(value)
+
+
+def test_amounts_are_bounded_to_the_column_range():
+    assert to_cents(MAX_CENTS / 100) == MAX_CENTS
+    with pytest.raises(ValueError):
+        to_cents((MAX_CENTS + 1) / 100)
+
+
+def test_huge_prices_are_rejected_with_400(client, make_user, make_product):
+    make_product()
+    _, headers = make_user('admin@example.com', UserRole.ADMIN)
+
+    assert client.get('/api/products?min_price=1e300').status_code == 400
+    assert client.get('/api/products?max_price=21474836.48').status_code == 400
+    for price in ('1e400', 1e30, 21474836.48):
+        response = client.post('/admin/product', headers=headers,
+                               json={'name': 'Gold', 'price': price, 'category_id': 1})
+        assert response.status_code == 400, price
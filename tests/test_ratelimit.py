@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.fixture
+def app_config():
+    return {'RATELIMIT_BACKEND': 'memory', 'RATELIMIT_LIMITS': {'auth': '1/60:2', 'cart': '1/60:1'}}
+
+
+def test_auth_limit_ignores_rotated_tokens(client, make_user):
+    tokens = [make_user(f'throwaway{i}@example.com')[1] for i in range(3)]
+    statuses = [
+        client.post('/auth/login', headers=headers, json={'email': 'victim@example.com', 'password': 'guess'}).status_code
+        for headers in tokens
+    ]
+    assert statuses == [401, 401, 429]
+
+
+def test_authenticated_groups_are_keyed_per_user(client, make_user):
+    _, first = make_user('first@example.com')
+    _, second = make_user('second@example.com')
+    assert client.patch('/cart', headers=first, json={'operations': []}).status_code != 429
+    assert client.patch('/cart', headers=first, json={'operations': []}).status_code == 429
+    assert client.patch('/cart', headers=second, json={'operations': []}).status_code != 429
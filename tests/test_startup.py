@@ -0,0 +1,9 @@
+from benchmarks.startup import DEFAULT_BUDGET_MS, profile
+
+
+def test_startup_stays_within_budget():
+    """Fresh interpreters import the app, create it and run init_database (warm bytecode cache)."""
+    warm = profile(modes=('warm',), runs=3)['warm']
+    assert warm['total_ms'] <= DEFAULT_BUDGET_MS, warm
+    # Migration tooling loads only for "flask db" commands
+    assert 'alembic' not in warm['packages_ms'], warm['packages_ms']
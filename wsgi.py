@@ -0,0 +1,9 @@
+"""Production entry point.
+
+    flask --app wsgi init-db                     # once per deployment
+    gunicorn -c gunicorn.conf.py wsgi:app
+    uvicorn --interface wsgi --workers 4 wsgi:app
+"""
+from backend import create_app
+
+app = create_app()